@@ -4,8 +4,11 @@
 
 from binance.um_futures import UMFutures
 from binance.error import ClientError
+from binance.websocket.um_futures.websocket_client import UMFuturesWebsocketClient
 from exchange.base import ExchangeClient
+import json
 import logging
+import threading
 import time
 from typing import List, Any
 
@@ -21,6 +24,16 @@ class BinanceClient(ExchangeClient):
         self.client = UMFutures(key=api_key, secret=api_secret, base_url=base_url)
         self.testnet = testnet
         self.exchange_name = "BINANCE"
+
+        # websocket 行情：{symbol: (價格, monotonic 時間戳)}，超過 price_stream_max_age 秒視為過期
+        self._ws_client = None
+        self._ws_connected = False
+        self._stream_symbols = set()
+        self._stream_lock = threading.Lock()
+        self._last_stream_start = float('-inf')
+        self._latest_prices = {}
+        self.price_stream_max_age = 5.0
+        self.price_stream_restart_interval = 30.0  # 秒，價格過期或斷線後重新連線的最短間隔
         
         # 初始化時進行時間同步
         self._sync_time()
@@ -43,8 +56,102 @@ class BinanceClient(ExchangeClient):
         except Exception as e:
             logging.warning(f"無法同步Binance服務器時間: {e}")
 
+    def start_price_stream(self, symbols: List[str]):
+        """
+        只訂閱指定幣種的 miniTicker websocket（<symbol>@miniTicker），在記憶體中維護其最新價格，
+        不訂閱全市場推送；已啟動時只追加訂閱新的幣種
+        """
+        with self._stream_lock:
+            new_symbols = {symbol.upper() for symbol in symbols} - self._stream_symbols
+            self._stream_symbols |= new_symbols
+            if self._ws_client is None:
+                self._connect_price_stream()
+            elif new_symbols:
+                try:
+                    self._ws_client.subscribe(stream=[f"{symbol.lower()}@miniTicker" for symbol in sorted(new_symbols)])
+                except Exception as e:
+                    logging.warning(f"訂閱 {sorted(new_symbols)} 價格 websocket 失敗: {e}，將使用 REST 取價")
+
+    def _connect_price_stream(self):
+        """建立價格 websocket 並以單一訊息訂閱所有已登記的幣種（呼叫端須持有 _stream_lock）"""
+        self._last_stream_start = time.monotonic()
+        if not self._stream_symbols:
+            return
+        stream_url = "wss://stream.binancefuture.com" if self.testnet else "wss://fstream.binance.com"
+        try:
+            self._ws_client = UMFuturesWebsocketClient(
+                stream_url=stream_url, on_message=self._on_ticker_message,
+                on_close=self._on_stream_closed, on_error=self._on_stream_error
+            )
+            self._ws_connected = True
+            self._ws_client.subscribe(stream=[f"{symbol.lower()}@miniTicker" for symbol in sorted(self._stream_symbols)])
+            logging.info(f"✅ Binance 價格 websocket 已啟動，訂閱: {sorted(self._stream_symbols)}")
+        except Exception as e:
+            logging.warning(f"啟動 Binance 價格 websocket 失敗: {e}，將使用 REST 取價")
+            self._ws_client = None
+            self._ws_connected = False
+
+    def _stop_ws_client(self):
+        """停止目前的價格 websocket（呼叫端須持有 _stream_lock）"""
+        if self._ws_client is not None:
+            try:
+                self._ws_client.stop()
+            except Exception as e:
+                logging.warning(f"停止 Binance 價格 websocket 失敗: {e}")
+        self._ws_client = None
+        self._ws_connected = False
+
+    def _on_stream_closed(self, _):
+        """websocket 收到關閉訊框：標記斷線，下次取價時回退 REST 並重新連線"""
+        self._ws_connected = False
+        logging.warning("Binance 價格 websocket 已關閉，將改用 REST 取價並重新連線")
+
+    def _on_stream_error(self, _, error):
+        """websocket 連線錯誤：標記斷線，下次取價時回退 REST 並重新連線"""
+        self._ws_connected = False
+        logging.warning(f"Binance 價格 websocket 發生錯誤: {error}，將改用 REST 取價並重新連線")
+
+    def _on_ticker_message(self, _, message):
+        """處理 miniTicker 推送，更新最新價格表"""
+        try:
+            data = json.loads(message)
+        except (TypeError, ValueError):
+            return
+        tickers = data if isinstance(data, list) else [data]
+        received_at = time.monotonic()
+        for ticker in tickers:
+            if isinstance(ticker, dict) and 's' in ticker and 'c' in ticker:
+                try:
+                    self._latest_prices[ticker['s']] = (float(ticker['c']), received_at)
+                except (TypeError, ValueError):
+                    continue
+
+    def _restart_price_stream(self, symbol: str):
+        """
+        已訂閱幣種的推送價格過期或連線已中斷時，記錄回退 REST 並重新建立 websocket；
+        每 price_stream_restart_interval 秒最多重新連線一次，其他執行緒正在重連時直接返回
+        """
+        if time.monotonic() - self._last_stream_start < self.price_stream_restart_interval:
+            return
+        if not self._stream_lock.acquire(blocking=False):
+            return
+        try:
+            if not self._stream_symbols or time.monotonic() - self._last_stream_start < self.price_stream_restart_interval:
+                return
+            state = "已中斷" if not self._ws_connected else "已過期"
+            logging.warning(f"{symbol}: websocket 推送價格{state}，改用 REST 取價並重新啟動價格 websocket")
+            self._stop_ws_client()
+            self._connect_price_stream()
+        finally:
+            self._stream_lock.release()
+
     def get_price(self, symbol: str) -> float:
-        """取得最新市價"""
+        """取得最新市價（優先使用 websocket 推送的價格，過期時回退 REST 並重新啟動 websocket）"""
+        cached = self._latest_prices.get(symbol)
+        if cached is not None and time.monotonic() - cached[1] <= self.price_stream_max_age:
+            return cached[0]
+        if symbol in self._stream_symbols:
+            self._restart_price_stream(symbol)
         try:
             ticker = self.client.ticker_price(symbol=symbol)
             return float(ticker['price'])
@@ -142,5 +249,7 @@ class BinanceClient(ExchangeClient):
             return None
 
     def close(self):
-        """Binance API 無需顯式關閉"""
-        pass 
\ No newline at end of file
+        """Binance REST API 無需顯式關閉，僅停止價格 websocket（之後不再自動重新連線）"""
+        with self._stream_lock:
+            self._stream_symbols = set()
+            self._stop_ws_client()
\ No newline at end of file
@@ -29,6 +29,10 @@ import numpy as np
 import pandas as pd
 import talib
 
+from trading.indicator_kernels import NUMBA_AVAILABLE
+from strategy.signal_kernels import ema_cross_side
+from strategy.shared_indicators import latest_atr
+
 ###############################################################################
 # Config 區：所有可調參數集中管理
 ###############################################################################
@@ -91,9 +95,20 @@ class EMACrossover(BaseStrategy):
     """A1: EMA 短週期交叉策略 (突破追價)"""
 
     def generate_signal(self, df: pd.DataFrame) -> List[Signal]:
+        side = self.cross_side(df)
+        if side == 0:
+            return []
+        return [self._make_signal(df, side)]
+
+    def cross_side(self, df: pd.DataFrame) -> int:
+        """回傳最近兩根 K 線的交叉方向：1 = 向上、-1 = 向下、0 = 未交叉"""
         fast = self.cfg["A1_fast"]
         slow = self.cfg["A1_slow"]
 
+        if NUMBA_AVAILABLE:
+            # 編譯後的核心只遞推出最後兩根的 EMA，不建立完整序列
+            return int(ema_cross_side(df["close"].to_numpy(dtype=np.float64), fast, slow))
+
         ema_fast = df["close"].ewm(span=fast).mean()
         ema_slow = df["close"].ewm(span=slow).mean()
 
@@ -102,14 +117,12 @@ class EMACrossover(BaseStrategy):
         cross_dn = ema_fast.iloc[-2] >= ema_slow.iloc[-2] and ema_fast.iloc[-1] < ema_slow.iloc[-1]
 
         if not (cross_up or cross_dn):
-            return []
-
-        side = 1 if cross_up else -1
-        return [self._make_signal(df, side)]
+            return 0
+        return 1 if cross_up else -1
 
     # ---------------------------------------------------------------------
     def _make_signal(self, df: pd.DataFrame, side: int) -> Signal:
-        entry = df["close"].iloc[-1]
+        entry = df["close"].to_numpy()[-1]
         sl, tp = calc_atr_sl_tp(df, side, self.cfg)
         return Signal(side, entry, sl, tp, self.name)
 
@@ -120,21 +133,26 @@ class BollingerBreakout(BaseStrategy):
         w = self.cfg["A2_window"]
         sigma = self.cfg["A2_sigma"]
 
-        ma = df["close"].rolling(window=w).mean()
-        std = df["close"].rolling(window=w).std()
+        # 只需最新一根的布林帶，直接對最後 w 根收盤價取均值與標準差
+        closes = df["close"].to_numpy(dtype=np.float64)
+        if len(closes) < w:
+            return []
+        window = closes[-w:]
+        ma = window.mean()
+        std = window.std(ddof=1)
         upper = ma + sigma * std
         lower = ma - sigma * std
 
-        close = df["close"].iloc[-1]
+        close = closes[-1]
         signals = []
-        if close > upper.iloc[-1]:
+        if close > upper:
             signals.append(self._make_signal(df, 1))
-        elif close < lower.iloc[-1]:
+        elif close < lower:
             signals.append(self._make_signal(df, -1))
         return signals
 
     def _make_signal(self, df, side):
-        entry = df["close"].iloc[-1]
+        entry = df["close"].to_numpy()[-1]
         sl, tp = calc_atr_sl_tp(df, side, self.cfg)
         return Signal(side, entry, sl, tp, self.name)
 
@@ -143,12 +161,13 @@ class VWAPMomentum(BaseStrategy):
 
     def generate_signal(self, df: pd.DataFrame) -> List[Signal]:
         dev_th = self.cfg["A3_deviation"]
-        cum_vol = df["volume"].cumsum()
-        cum_vol_price = (df["close"] * df["volume"]).cumsum()
-        vwap = cum_vol_price / cum_vol
+        # 只需最新的 VWAP，即全區間的成交額總和 / 成交量總和，不必建立累加序列
+        closes = df["close"].to_numpy(dtype=np.float64)
+        volumes = df["volume"].to_numpy(dtype=np.float64)
+        vwap = np.nansum(closes * volumes) / np.nansum(volumes)
 
-        price = df["close"].iloc[-1]
-        deviation = (price - vwap.iloc[-1]) / vwap.iloc[-1]
+        price = closes[-1]
+        deviation = (price - vwap) / vwap
 
         if abs(deviation) < dev_th:
             return []
@@ -157,7 +176,7 @@ class VWAPMomentum(BaseStrategy):
         return [self._make_signal(df, side)]
 
     def _make_signal(self, df, side):
-        entry = df["close"].iloc[-1]
+        entry = df["close"].to_numpy()[-1]
         sl, tp = calc_atr_sl_tp(df, side, self.cfg)
         return Signal(side, entry, sl, tp, self.name)
 
@@ -168,8 +187,10 @@ class VolumeSpikeBreakout(BaseStrategy):
         w = self.cfg["A4_window"]
         mult = self.cfg["A4_volume_mult"]
 
-        avg_vol = df["volume"].rolling(window=w).mean().iloc[-1]
-        cur_vol = df["volume"].iloc[-1]
+        volumes = df["volume"].to_numpy(dtype=np.float64)
+        # 與 rolling(w).mean() 相同：資料不足 w 根時均量為 NaN
+        avg_vol = volumes[-w:].mean() if len(volumes) >= w else np.nan
+        cur_vol = volumes[-1]
 
         if cur_vol < avg_vol * mult:
             return []
@@ -178,7 +199,7 @@ class VolumeSpikeBreakout(BaseStrategy):
         return [self._make_signal(df, side)]
 
     def _make_signal(self, df, side):
-        entry = df["close"].iloc[-1]
+        entry = df["close"].to_numpy()[-1]
         sl, tp = calc_atr_sl_tp(df, side, self.cfg)
         return Signal(side, entry, sl, tp, self.name)
 
@@ -204,8 +225,9 @@ class CCITrendFilter(BaseStrategy):
 def calc_atr_sl_tp(df: pd.DataFrame, side: int, cfg: Dict[str, Any]):
     """依 ATR 計算動態止盈/止損"""
     period = cfg["risk_atr_period"]
-    atr = talib.ATR(df["high"], df["low"], df["close"], timeperiod=period).iloc[-1]
-    entry = df["close"].iloc[-1]
+    # 同一份 K 線上多個子策略共用一次 ATR 計算
+    atr = latest_atr(df, period)
+    entry = df["close"].to_numpy()[-1]
     sl = entry - side * cfg["risk_sl_atr_mult"] * atr
     tp = entry + side * cfg["risk_tp_atr_mult"] * atr
     return sl, tp
@@ -241,11 +263,8 @@ def run(df: pd.DataFrame, user_config: Dict[str, Any] = None) -> List[Signal]:
 def strategy_ema3_ema8_crossover(df: pd.DataFrame) -> int:
     """EMA 3/8 交叉策略"""
     cfg = default_config()
-    strategy = EMACrossover("A1", cfg)
-    signals = strategy.generate_signal(df)
-    if signals:
-        return signals[0].side
-    return 0
+    # 只需要方向，不必建立 Signal 及計算止盈止損所需的 ATR
+    return EMACrossover("A1", cfg).cross_side(df)
 
 def strategy_bollinger_breakout(df: pd.DataFrame) -> int:
     """布林帶突破策略"""
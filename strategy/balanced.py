@@ -8,6 +8,8 @@ from typing import List, Dict, Any, Optional
 import pandas as pd
 import talib
 
+from strategy.shared_indicators import latest_atr
+
 # ------------------------------ 全域預設參數 -----------------------------
 
 def default_config() -> Dict[str, Any]:
@@ -169,7 +171,7 @@ def run(df: pd.DataFrame, user_cfg: Dict[str, Any] = None) -> List[Signal]:
         cfg.update(user_cfg)
     
     # 預計算 ATR
-    atr = talib.ATR(df["high"], df["low"], df["close"], timeperiod=cfg["risk_atr_period"]).iloc[-1]
+    atr = latest_atr(df, cfg["risk_atr_period"])
     
     strategies = [
         RSIMeanReversion("B1", cfg, atr),
@@ -190,7 +192,7 @@ def run(df: pd.DataFrame, user_cfg: Dict[str, Any] = None) -> List[Signal]:
 def strategy_rsi_mean_reversion(df: pd.DataFrame) -> int:
     """RSI 均值回歸策略"""
     cfg = default_config()
-    atr = talib.ATR(df["high"], df["low"], df["close"], timeperiod=cfg["risk_atr_period"]).iloc[-1]
+    atr = latest_atr(df, cfg["risk_atr_period"])
     strategy = RSIMeanReversion("B1", cfg, atr)
     signals = strategy.generate(df)
     if signals:
@@ -200,7 +202,7 @@ def strategy_rsi_mean_reversion(df: pd.DataFrame) -> int:
 def strategy_atr_breakout(df: pd.DataFrame) -> int:
     """ATR 突破策略"""
     cfg = default_config()
-    atr = talib.ATR(df["high"], df["low"], df["close"], timeperiod=cfg["risk_atr_period"]).iloc[-1]
+    atr = latest_atr(df, cfg["risk_atr_period"])
     strategy = ATRBreakout("B2", cfg, atr)
     signals = strategy.generate(df)
     if signals:
@@ -210,7 +212,7 @@ def strategy_atr_breakout(df: pd.DataFrame) -> int:
 def strategy_ma_channel(df: pd.DataFrame) -> int:
     """MA 通道策略"""
     cfg = default_config()
-    atr = talib.ATR(df["high"], df["low"], df["close"], timeperiod=cfg["risk_atr_period"]).iloc[-1]
+    atr = latest_atr(df, cfg["risk_atr_period"])
     strategy = MAChannel("B3", cfg, atr)
     signals = strategy.generate(df)
     if signals:
@@ -220,7 +222,7 @@ def strategy_ma_channel(df: pd.DataFrame) -> int:
 def strategy_volume_trend(df: pd.DataFrame) -> int:
     """成交量趨勢策略"""
     cfg = default_config()
-    atr = talib.ATR(df["high"], df["low"], df["close"], timeperiod=cfg["risk_atr_period"]).iloc[-1]
+    atr = latest_atr(df, cfg["risk_atr_period"])
     strategy = VolumeTrend("B4", cfg, atr)
     signals = strategy.generate(df)
     if signals:
@@ -230,7 +232,7 @@ def strategy_volume_trend(df: pd.DataFrame) -> int:
 def strategy_cci_mid_trend(df: pd.DataFrame) -> int:
     """CCI 中線趨勢策略"""
     cfg = default_config()
-    atr = talib.ATR(df["high"], df["low"], df["close"], timeperiod=cfg["risk_atr_period"]).iloc[-1]
+    atr = latest_atr(df, cfg["risk_atr_period"])
     strategy = CCITrendFilter("B5", cfg, atr)
     signals = strategy.generate(df)
     if signals:
@@ -121,16 +121,22 @@ def evaluate_bundles(df, style: str) -> int:
     if style not in strategy_bundles:
         raise ValueError(f"未知風格 {style}; 應為 {list(strategy_bundles)}")
 
+    # 同一子策略會出現在多個組合包中，每次評估只執行一次並重用結果
+    side_cache: Dict[Callable, int] = {}
+
     for bundle in strategy_bundles[style]:
         # 執行每一子策略並收集 side
         sides: List[int] = []
         for strat in bundle["strategies"]:
-            try:
-                result = strat(df)
-                sides.append(_to_side(result))
-            except Exception as e:
-                logging.exception(f"策略 {strat.__name__} 失敗: {e}")
-                sides.append(0)
+            side = side_cache.get(strat)
+            if side is None:
+                try:
+                    side = _to_side(strat(df))
+                except Exception as e:
+                    logging.exception(f"策略 {strat.__name__} 失敗: {e}")
+                    side = 0
+                side_cache[strat] = side
+            sides.append(side)
 
         decision = _vote(sides, style)
         if decision != 0:
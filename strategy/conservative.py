@@ -21,6 +21,8 @@ from typing import List, Dict, Any, Optional
 import pandas as pd
 import talib                       # TA-Lib 為技術指標計算函式庫
 
+from strategy.shared_indicators import latest_atr
+
 @dataclass
 class Signal:
     """標準化訊號；side: 1=多單, -1=空單"""
@@ -184,7 +186,7 @@ def run(df: pd.DataFrame, user_cfg: Dict[str, Any] | None = None) -> List[Signal
         cfg.update(user_cfg)
     
     # 預計算 ATR
-    atr = talib.ATR(df["high"], df["low"], df["close"], timeperiod=cfg["atr_period"]).iloc[-1]
+    atr = latest_atr(df, cfg["atr_period"])
     
     strategies = [
         EMA_Cross("C1", cfg, atr),
@@ -205,7 +207,7 @@ def run(df: pd.DataFrame, user_cfg: Dict[str, Any] | None = None) -> List[Signal
 def strategy_long_ema_crossover(df: pd.DataFrame) -> int:
     """長期EMA交叉策略"""
     cfg = default_config()
-    atr = talib.ATR(df["high"], df["low"], df["close"], timeperiod=cfg["atr_period"]).iloc[-1]
+    atr = latest_atr(df, cfg["atr_period"])
     strategy = EMA_Cross("C1", cfg, atr)
     signals = strategy.generate(df)
     if signals:
@@ -215,7 +217,7 @@ def strategy_long_ema_crossover(df: pd.DataFrame) -> int:
 def strategy_adx_trend(df: pd.DataFrame) -> int:
     """ADX趨勢策略"""
     cfg = default_config()
-    atr = talib.ATR(df["high"], df["low"], df["close"], timeperiod=cfg["atr_period"]).iloc[-1]
+    atr = latest_atr(df, cfg["atr_period"])
     strategy = ADX_Trend("C2", cfg, atr)
     signals = strategy.generate(df)
     if signals:
@@ -225,7 +227,7 @@ def strategy_adx_trend(df: pd.DataFrame) -> int:
 def strategy_bollinger_mean_reversion(df: pd.DataFrame) -> int:
     """布林帶均值回歸策略"""
     cfg = default_config()
-    atr = talib.ATR(df["high"], df["low"], df["close"], timeperiod=cfg["atr_period"]).iloc[-1]
+    atr = latest_atr(df, cfg["atr_period"])
     strategy = BB_MeanRev("C3", cfg, atr)
     signals = strategy.generate(df)
     if signals:
@@ -235,7 +237,7 @@ def strategy_bollinger_mean_reversion(df: pd.DataFrame) -> int:
 def strategy_ichimoku_cloud(df: pd.DataFrame) -> int:
     """一目均衡表雲層策略"""
     cfg = default_config()
-    atr = talib.ATR(df["high"], df["low"], df["close"], timeperiod=cfg["atr_period"]).iloc[-1]
+    atr = latest_atr(df, cfg["atr_period"])
     strategy = Ichimoku_Cloud("C4", cfg, atr)
     signals = strategy.generate(df)
     if signals:
@@ -245,7 +247,7 @@ def strategy_ichimoku_cloud(df: pd.DataFrame) -> int:
 def strategy_atr_mean_reversion(df: pd.DataFrame) -> int:
     """ATR均值回歸策略"""
     cfg = default_config()
-    atr = talib.ATR(df["high"], df["low"], df["close"], timeperiod=cfg["atr_period"]).iloc[-1]
+    atr = latest_atr(df, cfg["atr_period"])
     strategy = ATR_Extreme("C5", cfg, atr)
     signals = strategy.generate(df)
     if signals:
@@ -0,0 +1,29 @@
+# strategy/shared_indicators.py
+# 同一份 K 線 DataFrame 上多個子策略共用的指標計算
+
+import numpy as np
+import pandas as pd
+import talib
+
+
+def latest_atr(df: pd.DataFrame, period: int) -> float:
+    """
+    回傳最新一根 K 線的 ATR，與 talib.ATR(...).iloc[-1] 相同。
+    結果以 (K 線數量, 最後收盤價) 為鍵記錄在 df.attrs，
+    同一次評估中各子策略重複取用時不必再走訪整段 K 線。
+    """
+    key = f"_latest_atr_{period}"
+    close = df["close"].to_numpy(dtype=np.float64)
+    stamp = (len(close), float(close[-1]) if len(close) else None)
+    cached = df.attrs.get(key)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    atr = talib.ATR(
+        df["high"].to_numpy(dtype=np.float64),
+        df["low"].to_numpy(dtype=np.float64),
+        close,
+        timeperiod=period,
+    )[-1]
+    df.attrs[key] = (stamp, atr)
+    return atr
@@ -0,0 +1,52 @@
+# strategy/signal_kernels.py
+# 以 numba 編譯的策略訊號核心，未安裝 numba 時呼叫端改走 pandas 實作
+# pip install numba
+
+import numpy as np
+
+from trading.indicator_kernels import njit
+
+
+@njit(cache=True)
+def ema_cross_side(close, fast, slow):
+    """
+    判斷快慢 EMA 是否在最近兩根 K 線發生交叉，不建立完整的 EMA 序列。
+    EMA 與 pandas ewm(span=N).mean()（adjust=True、ignore_na=False）一致：
+    缺值不計入但權重照常衰減。
+    回傳：1 = 向上交叉，-1 = 向下交叉，0 = 未交叉（資料不足兩根時亦為 0）
+    """
+    n = close.shape[0]
+    if n < 2:
+        return 0
+
+    decay_fast = 1.0 - 2.0 / (fast + 1.0)
+    decay_slow = 1.0 - 2.0 / (slow + 1.0)
+    num_fast = 0.0
+    den_fast = 0.0
+    num_slow = 0.0
+    den_slow = 0.0
+    prev_fast = 0.0
+    prev_slow = 0.0
+    for i in range(n):
+        if i == n - 1:
+            prev_fast = num_fast / den_fast if den_fast > 0.0 else np.nan
+            prev_slow = num_slow / den_slow if den_slow > 0.0 else np.nan
+        c = close[i]
+        if c != c:
+            num_fast *= decay_fast
+            den_fast *= decay_fast
+            num_slow *= decay_slow
+            den_slow *= decay_slow
+        else:
+            num_fast = c + decay_fast * num_fast
+            den_fast = 1.0 + decay_fast * den_fast
+            num_slow = c + decay_slow * num_slow
+            den_slow = 1.0 + decay_slow * den_slow
+    last_fast = num_fast / den_fast if den_fast > 0.0 else np.nan
+    last_slow = num_slow / den_slow if den_slow > 0.0 else np.nan
+
+    if prev_fast <= prev_slow and last_fast > last_slow:
+        return 1
+    if prev_fast >= prev_slow and last_fast < last_slow:
+        return -1
+    return 0
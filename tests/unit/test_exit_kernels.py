@@ -0,0 +1,48 @@
+# test_exit_kernels.py
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+import numpy as np
+
+from trading.exit_kernels import EXIT_MODE_CODES, EXIT_REASONS, decide_exit
+
+# [價格止盈%, 價格止損%, 金額止盈, 金額止損, ATR 止盈倍數, ATR 止損倍數,
+#  混合最小止盈, 混合最大止盈, 混合最小止損, 混合最大止損]
+PARAMS = np.array([0.5, 0.25, 10.0, 5.0, 1.5, 1.0, 5.0, 20.0, 3.0, 10.0])
+
+
+def _reason(mode, is_buy, price, entry=100.0, qty=1.0, atr=np.nan):
+    pnl = (price - entry) * qty if is_buy else (entry - price) * qty
+    return EXIT_REASONS[decide_exit(is_buy, price, entry, qty, pnl, atr, EXIT_MODE_CODES[mode], PARAMS)]
+
+
+def test_percentage_mode():
+    assert _reason("PERCENTAGE", True, 100.6) == "take_profit_price_percent"
+    assert _reason("PERCENTAGE", True, 99.7) == "stop_loss_price_percent"
+    assert _reason("PERCENTAGE", False, 99.4) == "take_profit_price_percent"
+    assert _reason("PERCENTAGE", False, 100.1) == ""
+
+
+def test_amount_mode():
+    assert _reason("AMOUNT", True, 111.0) == "take_profit_amount"
+    assert _reason("AMOUNT", False, 106.0) == "stop_loss_amount"
+
+
+def test_atr_mode_ignores_nan_atr():
+    assert _reason("ATR", True, 103.1, atr=2.0) == "take_profit_atr"
+    assert _reason("ATR", False, 102.5, atr=2.0) == "stop_loss_atr"
+    assert _reason("ATR", True, 150.0, atr=np.nan) == ""
+
+
+def test_hybrid_mode_clamps_amounts():
+    # ATR 止盈金額 1.5 低於下限 5，以 5 為準
+    assert _reason("HYBRID", True, 104.0, atr=1.0) == ""
+    assert _reason("HYBRID", True, 105.0, atr=1.0) == "take_profit_hybrid"
+    # ATR 止損金額 50 高於上限 10，以 10 為準
+    assert _reason("HYBRID", True, 90.0, atr=50.0) == "stop_loss_hybrid"
+
+
+def test_hybrid_exit_nan_atr_holds():
+    from trading.exit_kernels import hybrid_exit
+    assert hybrid_exit(100.0, 1.0, np.nan, 1.5, 1.0, 5.0, 20.0, 3.0, 10.0) == 0
+    assert hybrid_exit(-4.0, 1.0, 1.0, 1.5, 1.0, 5.0, 20.0, 3.0, 10.0) == -1
@@ -0,0 +1,89 @@
+# test_indicator_kernels.py
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+import pytest
+import numpy as np
+import pandas as pd
+
+talib = pytest.importorskip("talib")
+from trading.indicator_kernels import (
+    FUSED_STATE_SIZE, fused_indicators, fused_indicators_advance, atr_stats, atr_advance
+)
+
+
+def _random_ohlc(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    high = close + rng.random(n)
+    low = close - rng.random(n)
+    return close, high, low
+
+
+# --- 測試 1: 融合核心與 pandas / talib 的結果一致 ---
+@pytest.mark.parametrize("n", [50, 120, 500])
+def test_fused_indicators_match_reference(n):
+    close, high, low = _random_ohlc(n)
+    ema_5, ema_20, rsi, macd, macd_signal, atr = fused_indicators(close, high, low)
+
+    ref_macd, ref_signal, _ = talib.MACD(close, fastperiod=12, slowperiod=26, signalperiod=9)
+    expected = [
+        (ema_5, pd.Series(close).ewm(span=5).mean().to_numpy()),
+        (ema_20, pd.Series(close).ewm(span=20).mean().to_numpy()),
+        (rsi, talib.RSI(close, timeperiod=14)),
+        (macd, ref_macd),
+        (macd_signal, ref_signal),
+        (atr, talib.ATR(high, low, close, timeperiod=14)),
+    ]
+    for actual, reference in expected:
+        np.testing.assert_allclose(actual, reference, rtol=1e-9, atol=1e-9)
+
+
+# --- 測試 2: 價格不變時 RSI 為 0、ATR 為 0 ---
+def test_fused_indicators_flat_prices():
+    close = np.full(60, 10.0)
+    _, _, rsi, _, _, atr = fused_indicators(close, close.copy(), close.copy())
+    assert np.all(rsi[14:] == 0.0)
+    assert np.all(atr[14:] == 0.0)
+
+
+# --- 測試 2b: 以前一根為止的狀態續算最後一根，結果與完整走訪逐位元相同 ---
+def test_fused_indicators_advance_resume_is_exact():
+    close, high, low = _random_ohlc(200, seed=3)
+    state = np.zeros(FUSED_STATE_SIZE)
+    outputs = [np.empty(200), np.empty(200)] + [np.full(200, np.nan) for _ in range(4)]
+    fused_indicators_advance(close, high, low, 0, 199, state, *outputs)
+
+    close[-1] += 0.5
+    high[-1] += 0.8
+    fused_indicators_advance(close, high, low, 199, 200, state, *outputs)
+    for actual, expected in zip(outputs, fused_indicators(close, high, low)):
+        np.testing.assert_array_equal(actual, expected)
+
+
+# --- 測試 3: ATR 統計核心與 talib ATR 的最新值 / 平均值一致 ---
+@pytest.mark.parametrize("n", [15, 200, 500])
+def test_atr_stats_match_talib(n):
+    close, high, low = _random_ohlc(n, seed=n)
+    last_atr, mean_atr = atr_stats(high, low, close, 14)
+    reference = talib.ATR(high, low, close, timeperiod=14)
+    np.testing.assert_allclose(last_atr, reference[-1], rtol=1e-9)
+    np.testing.assert_allclose(mean_atr, np.nanmean(reference), rtol=1e-9)
+
+
+def test_atr_stats_insufficient_data():
+    close, high, low = _random_ohlc(14)
+    assert all(np.isnan(atr_stats(high, low, close, 14)))
+
+
+def test_atr_advance_matches_full_recompute():
+    close, high, low = _random_ohlc(300, seed=7)
+    last_atr, mean_atr = atr_stats(high[:200], low[:200], close[:200], 14)
+    atr_value, average_atr, count, prev_close = atr_advance(
+        last_atr, mean_atr, 200 - 14, close[199], high[200:], low[200:], close[200:], 14, 10**9
+    )
+    full_last, full_mean = atr_stats(high, low, close, 14)
+    np.testing.assert_allclose(atr_value, full_last, rtol=1e-9)
+    np.testing.assert_allclose(average_atr, full_mean, rtol=1e-9)
+    assert count == 300 - 14
+    assert prev_close == close[-1]
@@ -0,0 +1,36 @@
+# test_shared_indicators.py
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+import talib
+
+from strategy import shared_indicators
+from strategy.shared_indicators import latest_atr
+
+
+def _df(n=120, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    return pd.DataFrame({'high': close + 1.0, 'low': close - 1.0, 'close': close})
+
+
+def test_latest_atr_matches_talib_and_is_reused():
+    df = _df()
+    expected = talib.ATR(df['high'], df['low'], df['close'], timeperiod=14).iloc[-1]
+    with mock.patch.object(shared_indicators.talib, 'ATR', wraps=talib.ATR) as atr:
+        assert latest_atr(df, 14) == expected
+        assert latest_atr(df, 14) == expected
+    assert atr.call_count == 1
+
+
+def test_latest_atr_recomputes_when_last_bar_changes():
+    df = _df()
+    latest_atr(df, 14)
+    df.loc[df.index[-1], 'close'] += 5.0
+    expected = talib.ATR(df['high'], df['low'], df['close'], timeperiod=14).iloc[-1]
+    assert latest_atr(df, 14) == expected
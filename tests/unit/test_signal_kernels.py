@@ -0,0 +1,41 @@
+# test_signal_kernels.py
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import numpy as np
+import pandas as pd
+
+from strategy.signal_kernels import ema_cross_side
+
+
+def _pandas_cross_side(close, fast, slow):
+    series = pd.Series(close)
+    ema_fast = series.ewm(span=fast).mean()
+    ema_slow = series.ewm(span=slow).mean()
+    if ema_fast.iloc[-2] <= ema_slow.iloc[-2] and ema_fast.iloc[-1] > ema_slow.iloc[-1]:
+        return 1
+    if ema_fast.iloc[-2] >= ema_slow.iloc[-2] and ema_fast.iloc[-1] < ema_slow.iloc[-1]:
+        return -1
+    return 0
+
+
+def test_ema_cross_side_matches_pandas():
+    rng = np.random.default_rng(3)
+    close = 100 + np.cumsum(rng.normal(0, 1, 400))
+    sides = [ema_cross_side(close[:end], 3, 8) for end in range(2, len(close) + 1)]
+    assert sides == [_pandas_cross_side(close[:end], 3, 8) for end in range(2, len(close) + 1)]
+    # 隨機漫步中必定同時出現向上與向下交叉
+    assert 1 in sides and -1 in sides
+
+
+def test_ema_cross_side_skips_missing_values():
+    rng = np.random.default_rng(5)
+    close = 100 + np.cumsum(rng.normal(0, 1, 200))
+    close[[10, 50, 51]] = np.nan
+    for end in range(60, 200):
+        assert ema_cross_side(close[:end], 3, 8) == _pandas_cross_side(close[:end], 3, 8)
+
+
+def test_ema_cross_side_insufficient_data():
+    assert ema_cross_side(np.array([100.0]), 3, 8) == 0
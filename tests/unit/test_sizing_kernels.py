@@ -0,0 +1,37 @@
+# test_sizing_kernels.py
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+import math
+
+from trading.sizing_kernels import position_size, volatility_size_factor
+
+# 基礎 / 最小 / 最大資金比例
+RATIOS = (0.1, 0.05, 0.3)
+
+
+def _size(balance=1000.0, price=100.0, current_atr=2.0, reference_atr=2.0, use_atr=True,
+          max_notional=math.inf, min_quantity=0.001):
+    return position_size(balance, price, current_atr, reference_atr, use_atr, *RATIOS, max_notional, min_quantity)
+
+
+def test_ratio_scales_with_atr_and_is_clamped():
+    assert _size()[0] == 0.1
+    assert _size(current_atr=4.0)[0] == 0.05
+    assert _size(current_atr=1.0)[0] == 0.2
+    assert _size(current_atr=0.1)[0] == 0.3
+    assert _size(current_atr=math.nan)[0] == 0.3
+    assert _size(current_atr=math.nan, use_atr=False)[0] == 0.1
+
+
+def test_quantity_capped_by_notional_and_min_quantity():
+    ratio, quantity, raw_notional = _size(max_notional=50.0)
+    assert raw_notional == 100.0
+    assert quantity == 0.5
+    assert _size(balance=0.5)[1] == 0.0
+
+
+def test_volatility_size_factor():
+    assert volatility_size_factor(4.0, 1.0, 2.0) == (4.0, 0.5)
+    assert volatility_size_factor(0.25, 1.0, 2.0) == (0.25, 1.5)
+    assert volatility_size_factor(1.0, 1.0, 2.0) == (1.0, 1.0)
@@ -91,7 +91,7 @@ class ConfigManager:
                 config.value = str(value)
                 config.value_type = value_type
                 config.description = description
-                config.save()
+                config.save(update_fields=['value', 'value_type', 'description', 'updated_at'])
             
             # 更新快取
             self._cache[key] = self._convert_type(str(value), self._get_type_from_string(value_type))
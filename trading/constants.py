@@ -16,6 +16,10 @@ SIGNAL_BUY = 1 # 買入信號
 SIGNAL_SELL = -1 # 賣出信號
 SIGNAL_HOLD = 0 # 持有信號
 
+# 信號 → 下單方向、持倉方向 → 平倉方向的對照表
+SIGNAL_TO_SIDE = {SIGNAL_BUY: SIDE_BUY, SIGNAL_SELL: SIDE_SELL}
+REVERSE_SIDE = {SIDE_BUY: SIDE_SELL, SIDE_SELL: SIDE_BUY}
+
 # 交易所名稱常數
 EXCHANGE_BINANCE = "BINANCE" # 幣安
 EXCHANGE_BYBIT = "BYBIT"     # BYBIT
@@ -0,0 +1,88 @@
+# trading/exit_kernels.py
+# 以 numba 編譯的平倉條件判斷，未安裝 numba 時以純 Python 執行
+# pip install numba
+
+from trading.indicator_kernels import njit
+
+# EXIT_MODE 對應的整數代碼，未知模式不觸發任何平倉
+EXIT_MODE_CODES = {
+    "PERCENTAGE": 0,
+    "AMOUNT": 1,
+    "ATR": 2,
+    "HYBRID": 3,
+}
+
+# decide_exit 回傳的原因代碼對應的字串，0 表示未觸發
+EXIT_REASONS = (
+    "",
+    "take_profit_price_percent",
+    "stop_loss_price_percent",
+    "take_profit_amount",
+    "stop_loss_amount",
+    "take_profit_atr",
+    "stop_loss_atr",
+    "take_profit_hybrid",
+    "stop_loss_hybrid",
+)
+
+
+@njit(cache=True)
+def hybrid_exit(pnl, qty, atr, tp_mult, sl_mult, tp_min, tp_max, sl_min, sl_max):
+    """
+    HYBRID 模式：ATR 換算的止盈/止損金額夾在上下限之間後與浮動盈虧比較。
+    回傳 1=止盈、-1=止損、0=持有。
+    以與 Python 內建 min/max 相同的比較順序夾取上下限，ATR 為 NaN 時一律持有。
+    """
+    atr_tp_amount = atr * qty * tp_mult
+    atr_sl_amount = atr * qty * sl_mult
+    take_profit_amount = tp_max if tp_max < atr_tp_amount else atr_tp_amount
+    take_profit_amount = tp_min if tp_min > take_profit_amount else take_profit_amount
+    stop_loss_amount = sl_min if sl_min > atr_sl_amount else atr_sl_amount
+    stop_loss_amount = sl_max if sl_max < stop_loss_amount else stop_loss_amount
+    if pnl >= take_profit_amount:
+        return 1
+    if pnl <= -stop_loss_amount:
+        return -1
+    return 0
+
+
+@njit(cache=True)
+def decide_exit(is_buy, price, entry, qty, pnl, atr, mode_code, params):
+    """
+    依止盈止損模式判斷是否平倉，回傳 EXIT_REASONS 的索引（0 表示不平倉）。
+    params 依序為：
+    [價格止盈%, 價格止損%, 金額止盈, 金額止損, ATR 止盈倍數, ATR 止損倍數,
+     混合最小止盈, 混合最大止盈, 混合最小止損, 混合最大止損]
+    ATR 為 NaN 時所有比較皆不成立，與原本的 Python 判斷一致，故不使用 fastmath。
+    """
+    # 以方向係數 direction 統一多空判斷：空單時價格與門檻同乘 -1，比較方向隨之反轉。
+    # 乘以 ±1 與 1 + (-x) 在浮點運算中皆為精確值，結果與分別撰寫多空分支相同
+    direction = 1.0 if is_buy else -1.0
+    signed_price = direction * price
+    if mode_code == 0:
+        take_profit_price = entry * (1 + direction * params[0] / 100)
+        stop_loss_price = entry * (1 - direction * params[1] / 100)
+        if signed_price >= direction * take_profit_price:
+            return 1
+        if signed_price <= direction * stop_loss_price:
+            return 2
+    elif mode_code == 1:
+        if pnl >= params[2]:
+            return 3
+        if pnl <= -params[3]:
+            return 4
+    elif mode_code == 2:
+        take_profit_price = entry + direction * (atr * params[4])
+        stop_loss_price = entry - direction * (atr * params[5])
+        if signed_price >= direction * take_profit_price:
+            return 5
+        if signed_price <= direction * stop_loss_price:
+            return 6
+    elif mode_code == 3:
+        decision = hybrid_exit(pnl, qty, atr, params[4], params[5],
+                               params[6], params[7], params[8], params[9])
+        if decision == 1:
+            return 7
+        if decision == -1:
+            return 8
+    return 0
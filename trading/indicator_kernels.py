@@ -0,0 +1,202 @@
+# trading/indicator_kernels.py
+# 以 numba 編譯的技術指標核心，需安裝 numba 套件
+# pip install numba
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    # 如果 numba 模組不可用，呼叫端應改走 talib / pandas 的實作
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+# fused_indicators_advance 的遞推狀態長度：
+# EMA5/EMA20 的分子與權重和、RSI 平均漲跌幅、ATR、MACD 快慢線的種子總和與數值、訊號線的種子總和與數值
+FUSED_STATE_SIZE = 13
+
+
+@njit(cache=True)
+def fused_indicators(close, high, low):
+    """
+    單次走訪 close/high/low，同時計算 EMA5、EMA20、RSI14、MACD(12,26,9)、ATR14。
+    數值與 pandas ewm(span=N).mean() 及 talib 的 RSI / MACD / ATR 一致，
+    暖機期間輸出 NaN。
+    回傳：(ema_5, ema_20, rsi, macd, macd_signal, atr)
+    """
+    n = close.shape[0]
+    ema_5 = np.empty(n)
+    ema_20 = np.empty(n)
+    rsi = np.full(n, np.nan)
+    macd = np.full(n, np.nan)
+    macd_signal = np.full(n, np.nan)
+    atr = np.full(n, np.nan)
+    state = np.zeros(FUSED_STATE_SIZE)
+    fused_indicators_advance(close, high, low, 0, n, state, ema_5, ema_20, rsi, macd, macd_signal, atr)
+    return ema_5, ema_20, rsi, macd, macd_signal, atr
+
+
+@njit(cache=True)
+def fused_indicators_advance(close, high, low, start, end, state,
+                             ema_5, ema_20, rsi, macd, macd_signal, atr):
+    """
+    fused_indicators 的遞推主體：從 start 走訪到 end（不含），就地寫入各指標陣列的 [start, end) 區段，
+    並以 state 保存走訪到 end 時的遞推狀態。
+    以 start 之前的狀態續算時，結果與從頭走訪逐位元相同；
+    首次計算時 start 為 0，state 為長度 FUSED_STATE_SIZE 的零陣列，各指標陣列的暖機區段須預先填入 NaN。
+    """
+    # pandas ewm(adjust=True) 的遞推：分子與權重和分別累加
+    decay_5 = 1.0 - 2.0 / 6.0
+    decay_20 = 1.0 - 2.0 / 21.0
+    num_5 = state[0]
+    den_5 = state[1]
+    num_20 = state[2]
+    den_20 = state[3]
+
+    # talib 風格的 RSI / ATR（Wilder 平滑，以 SMA 作為種子）
+    rsi_period = 14
+    gain_avg = state[4]
+    loss_avg = state[5]
+    atr_period = 14
+    atr_value = state[6]
+
+    # talib 風格的 MACD：快慢 EMA 都以 SMA 作為種子，並在慢線暖機完成時對齊
+    k_fast = 2.0 / 13.0
+    k_slow = 2.0 / 27.0
+    k_signal = 2.0 / 10.0
+    fast_start = 26 - 12  # 快線以 close[14:26] 的 SMA 作為種子
+    fast_sum = state[7]
+    slow_sum = state[8]
+    fast_ema = state[9]
+    slow_ema = state[10]
+    signal_sum = state[11]
+    signal_ema = state[12]
+
+    for i in range(start, end):
+        c = close[i]
+
+        num_5 = c + decay_5 * num_5
+        den_5 = 1.0 + decay_5 * den_5
+        ema_5[i] = num_5 / den_5
+        num_20 = c + decay_20 * num_20
+        den_20 = 1.0 + decay_20 * den_20
+        ema_20[i] = num_20 / den_20
+
+        if i > 0:
+            prev_close = close[i - 1]
+
+            change = c - prev_close
+            gain = change if change > 0.0 else 0.0
+            loss = -change if change < 0.0 else 0.0
+            if i <= rsi_period:
+                gain_avg += gain
+                loss_avg += loss
+                if i == rsi_period:
+                    gain_avg /= rsi_period
+                    loss_avg /= rsi_period
+            else:
+                gain_avg = (gain_avg * (rsi_period - 1) + gain) / rsi_period
+                loss_avg = (loss_avg * (rsi_period - 1) + loss) / rsi_period
+            if i >= rsi_period:
+                total = gain_avg + loss_avg
+                rsi[i] = 100.0 * gain_avg / total if total != 0.0 else 0.0
+
+            true_range = max(high[i], prev_close) - min(low[i], prev_close)
+            if i <= atr_period:
+                atr_value += true_range
+                if i == atr_period:
+                    atr_value /= atr_period
+                    atr[i] = atr_value
+            else:
+                atr_value = (atr_value * (atr_period - 1) + true_range) / atr_period
+                atr[i] = atr_value
+
+        if i >= fast_start:
+            if i < 26:
+                fast_sum += c
+            else:
+                fast_ema = (c - fast_ema) * k_fast + fast_ema
+        if i < 26:
+            slow_sum += c
+        else:
+            slow_ema = (c - slow_ema) * k_slow + slow_ema
+        if i == 25:
+            fast_ema = fast_sum / 12.0
+            slow_ema = slow_sum / 26.0
+        if i >= 25:
+            macd_value = fast_ema - slow_ema
+            if i < 34:
+                signal_sum += macd_value
+                if i == 33:
+                    signal_ema = signal_sum / 9.0
+            else:
+                signal_ema = (macd_value - signal_ema) * k_signal + signal_ema
+            if i >= 33:
+                macd[i] = macd_value
+                macd_signal[i] = signal_ema
+
+    state[0] = num_5
+    state[1] = den_5
+    state[2] = num_20
+    state[3] = den_20
+    state[4] = gain_avg
+    state[5] = loss_avg
+    state[6] = atr_value
+    state[7] = fast_sum
+    state[8] = slow_sum
+    state[9] = fast_ema
+    state[10] = slow_ema
+    state[11] = signal_sum
+    state[12] = signal_ema
+
+
+@njit(cache=True, nogil=True)
+def atr_stats(high, low, close, period):
+    """
+    單次走訪計算 Wilder ATR 的最新值與平均值，不建立完整的 ATR 陣列。
+    與 talib.ATR 相同：前 period 根真實波幅的簡單平均作為第一個 ATR，暖機期不計入平均。
+    釋放 GIL，可在多個執行緒中同時計算不同幣種。
+    回傳：(最新 ATR, 平均 ATR)；資料不足時皆為 NaN
+    """
+    n = close.shape[0]
+    if n <= period:
+        return np.nan, np.nan
+
+    atr_value = 0.0
+    atr_sum = 0.0
+    for i in range(1, n):
+        prev_close = close[i - 1]
+        true_range = max(high[i], prev_close) - min(low[i], prev_close)
+        if i <= period:
+            atr_value += true_range
+            if i == period:
+                atr_value /= period
+                atr_sum += atr_value
+        else:
+            atr_value = (atr_value * (period - 1) + true_range) / period
+            atr_sum += atr_value
+    return atr_value, atr_sum / (n - period)
+
+
+@njit(cache=True, nogil=True)
+def atr_advance(atr_value, atr_mean, count, prev_close, high, low, close, period, max_count):
+    """
+    以新收盤的 K 線遞推 Wilder ATR 與其平均值，不必重新走訪整段歷史。
+    平均值以 mean += (atr - mean) / count 遞推，count 上限為 max_count，
+    達上限後新的 ATR 以固定權重併入，使平均值只反映最近約 max_count 根 K 線。
+    回傳：(最新 ATR, 平均 ATR, 計入平均的數量, 最後收盤價)
+    """
+    for i in range(close.shape[0]):
+        true_range = max(high[i], prev_close) - min(low[i], prev_close)
+        atr_value = (atr_value * (period - 1) + true_range) / period
+        if count < max_count:
+            count += 1
+        atr_mean += (atr_value - atr_mean) / count
+        prev_close = close[i]
+    return atr_value, atr_mean, count, prev_close
@@ -0,0 +1,52 @@
+# trading/sizing_kernels.py
+# 以 numba 編譯的下單數量計算，未安裝 numba 時以純 Python 執行
+# pip install numba
+
+from trading.indicator_kernels import njit
+
+
+@njit(cache=True, error_model='numpy')
+def position_size(balance, price, current_atr, reference_atr, use_atr,
+                  base_ratio, min_ratio, max_ratio, max_notional, min_quantity):
+    """
+    依 ATR 動態資金比例計算下單數量，並套用槓桿名義價值上限與最小交易量。
+    use_atr 為 False 時直接使用基礎資金比例。
+    以與 Python 內建 min/max 相同的比較順序夾取比例，當前 ATR 為 NaN 時取最大比例。
+    回傳：(資金比例, 下單數量, 原始名義價值)；數量尚未依幣種精度四捨五入。
+    """
+    if not use_atr:
+        ratio = base_ratio
+    elif current_atr < 1e-9:
+        # ATR 接近零，波動性極低，使用最大比例
+        ratio = max_ratio
+    else:
+        scaled = base_ratio * (reference_atr / current_atr)
+        ratio = scaled if scaled < max_ratio else max_ratio
+        ratio = ratio if ratio > min_ratio else min_ratio
+
+    capital = balance * ratio
+    raw_quantity = capital / price
+    raw_notional = raw_quantity * price
+
+    quantity = raw_quantity
+    if raw_notional > max_notional:
+        quantity = max_notional / price
+    if quantity < min_quantity:
+        quantity = 0.0
+    return ratio, quantity, raw_notional
+
+
+@njit(cache=True, error_model='numpy')
+def volatility_size_factor(current_atr, average_atr, threshold_multiplier):
+    """
+    依當前 ATR 與歷史平均 ATR 的比率回傳倉位調整係數。
+    比率高於門檻時按比例縮減，低於 0.5 時最多放大 1.5 倍，其餘為 1。
+    回傳：(ATR 比率, 調整係數)
+    """
+    atr_ratio = current_atr / average_atr
+    # 兩種調整係數皆先計算，再以條件選取，編譯後為無分支的 select
+    high_factor = threshold_multiplier / atr_ratio
+    inverse = 1.0 / atr_ratio
+    low_factor = inverse if inverse < 1.5 else 1.5
+    factor = high_factor if atr_ratio > threshold_multiplier else (low_factor if atr_ratio < 0.5 else 1.0)
+    return atr_ratio, factor
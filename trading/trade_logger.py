@@ -8,6 +8,7 @@ import logging
 import json
 import csv
 import os
+import threading
 from datetime import datetime, timezone
 from typing import Dict, Any, Optional, List
 from dataclasses import dataclass, asdict
@@ -119,6 +120,10 @@ class TradeLogger:
         # 初始化CSV文件
         self.trade_csv_path = os.path.join(log_dir, 'trades.csv')
         self.init_csv_files()
+        # 交易記錄檔在首次寫入時開啟並持續保留，不再每筆交易開關一次檔案
+        self._csv_lock = threading.Lock()
+        self._csv_file = None
+        self._csv_writer = None
         
         logger.info("交易日誌記錄器初始化完成")
     
@@ -222,12 +227,28 @@ class TradeLogger:
                 json.dumps(order_info.tags)
             ]
             
-            with open(self.trade_csv_path, 'a', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow(row_data)
+            # 每筆寫入後立即 flush，回測引擎等讀取端可馬上讀到新紀錄
+            with self._csv_lock:
+                if self._csv_file is None:
+                    self._csv_file = open(self.trade_csv_path, 'a', newline='', encoding='utf-8')
+                    self._csv_writer = csv.writer(self._csv_file)
+                self._csv_writer.writerow(row_data)
+                self._csv_file.flush()
                 
         except Exception as e:
             logger.error(f"寫入交易CSV失敗: {e}")
+            self.close()
+
+    def close(self):
+        """關閉交易記錄檔，之後的寫入會重新開啟"""
+        with self._csv_lock:
+            if self._csv_file is not None:
+                try:
+                    self._csv_file.close()
+                except OSError as e:
+                    logger.error(f"關閉交易CSV失敗: {e}")
+                self._csv_file = None
+                self._csv_writer = None
 
 # 創建全局實例
 trade_logger = TradeLogger()
@@ -5,19 +5,40 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import time
+import atexit
+import bisect
+import math
 import logging
+import threading
+import numpy as np
 import pandas as pd
 import talib
 import json
 import ccxt
+try:
+    import orjson
+except ImportError:
+    # 如果 orjson 模組不可用，使用標準庫 json 解析
+    orjson = None
 from binance.error import ClientError
+import csv
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import accumulate
 from datetime import datetime, timedelta
 from exchange.load_exchange_client import load_exchange_client
-from trading.constants import SIDE_BUY, SIDE_SELL, SYMBOL_PRECISION
+from trading.constants import SIDE_BUY, SIDE_SELL, SYMBOL_PRECISION, SIGNAL_TO_SIDE, REVERSE_SIDE
 from strategy.base import evaluate_bundles, strategy_bundles
 from trading.utils import get_precision
+from trading.indicator_kernels import (
+    NUMBA_AVAILABLE, FUSED_STATE_SIZE, fused_indicators, fused_indicators_advance, atr_stats, atr_advance
+)
+from trading.exit_kernels import EXIT_MODE_CODES, EXIT_REASONS, decide_exit
+from trading.sizing_kernels import position_size, volatility_size_factor
 from django.utils import timezone
-from django.db import transaction
+from django.db import connection, transaction
+from django.db.models import F
 from trading_api.models import (
     TraderConfig, TradingPair, DailyStats, TraderStatus, 
     Position, StrategyCombo, VolatilityPauseStatus
@@ -57,6 +78,68 @@ from strategy.conservative import (
     strategy_atr_mean_reversion
 )
 
+# --- 布林配置值中視為 True 的字串 ---
+# 先以原字串比對常見寫法，未命中才轉小寫再比對
+_TRUE_STRINGS = frozenset({'true', '1', 't', 'y', 'yes', 'True', 'TRUE', 'T', 'Y', 'Yes', 'YES'})
+
+# --- 開倉前必須具備的指標欄位（由 precompute_indicators 產生） ---
+_REQUIRED_INDICATOR_COLUMNS = ('ema_5', 'ema_20', 'rsi', 'macd', 'macd_signal', 'atr')
+
+@dataclass(slots=True)
+class VolatilitySnapshot:
+    """單一幣種本週期的波動率數值，供暫停檢查與倉位調整共用"""
+    avg_atr: float | None = None
+    current_atr: float | None = None
+    atr_ratio: float | None = None
+    valid: bool = False
+    warning: str | None = None  # 無效時的原因（供暫停檢查記錄日誌）
+
+@dataclass(slots=True, frozen=True)
+class TraderConfigSnapshot:
+    """平倉檢查熱路徑使用的配置快照，每次重新載入配置時整份重建"""
+    symbol_intervals: dict
+    exit_mode: str
+    price_take_profit_percent: float
+    price_stop_loss_percent: float
+    amount_take_profit_usdt: float
+    amount_stop_loss_usdt: float
+    atr_take_profit_multiplier: float
+    atr_stop_loss_multiplier: float
+    hybrid_min_take_profit_usdt: float
+    hybrid_max_take_profit_usdt: float
+    hybrid_min_stop_loss_usdt: float
+    hybrid_max_stop_loss_usdt: float
+    enable_trade_log: bool
+
+# --- trade_log.csv 的表頭與時間欄位格式 ---
+_TRADE_LOG_HEADER = ('time', 'symbol', 'side', 'entry_price', 'exit_price', 'quantity', 'pnl', 'reason')
+_TRADE_LOG_TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# --- K 線週期單位對應的毫秒數（用於推算平均 ATR 遞推狀態之後的新 K 線數量） ---
+_INTERVAL_UNIT_MS = {'m': 60_000, 'h': 3_600_000, 'd': 86_400_000, 'w': 604_800_000}
+
+
+def _interval_to_ms(interval: str) -> int | None:
+    """將 '1m'、'4h' 等 K 線週期轉為毫秒，無法解析時回傳 None"""
+    unit_ms = _INTERVAL_UNIT_MS.get(interval[-1:])
+    if unit_ms is None or not interval[:-1].isdigit():
+        return None
+    return int(interval[:-1]) * unit_ms
+
+# --- 各幣種狀態的初始值（使用時複製一份） ---
+_VOLATILITY_PAUSE_DEFAULTS = {
+    'is_paused': False,
+    'pause_start_time': None,
+    'pause_reason': None,
+    'current_atr_ratio': 1.0
+}
+_POSITION_DEFAULTS = {
+    'active': False,
+    'side': None,
+    'entry_price': None,
+    'quantity': 0.0,
+}
+
 # --- 定義所有單一策略的映射 ---
 # 這個字典將策略函數名稱（字串）映射到實際的函數物件
 ALL_STRATEGIES_MAP = {
@@ -118,9 +201,13 @@ def auto_detect_combo(df: pd.DataFrame, auto_conditions=None) -> str:
 
         if indicator == "ATR":
             if "atr" not in df.columns:
-                import talib
-                df["atr"] = talib.ATR(df["high"], df["low"], df["close"], timeperiod=period)
-            atr_value = df["atr"].iloc[-1]
+                df["atr"] = talib.ATR(
+                    df["high"].to_numpy(dtype=np.float64),
+                    df["low"].to_numpy(dtype=np.float64),
+                    df["close"].to_numpy(dtype=np.float64),
+                    timeperiod=period
+                )
+            atr_value = df["atr"].iat[-1]
             if atr_value > thresholds.get("high", 100):
                 return mapping.get("high", "aggressive")
             elif atr_value > thresholds.get("medium", 50):
@@ -132,13 +219,20 @@ def auto_detect_combo(df: pd.DataFrame, auto_conditions=None) -> str:
         logging.warning("K線數據不足或為空，無法進行K線型態自動判斷，預設為『平衡』策略組合。")
         return "balanced" 
 
-    avg_candle_range = (df['high'].iloc[-20:] - df['low'].iloc[-20:]).mean()
+    # 直接在 numpy 視圖上做 20 根K線的歸約，避免建立中間 Series
+    high_20 = df['high'].to_numpy()[-20:]
+    low_20 = df['low'].to_numpy()[-20:]
+    avg_candle_range = (high_20 - low_20).mean()
+    if np.isnan(avg_candle_range):
+        # 含缺值時所有比較皆不成立，結果同樣落在『平衡』，提前返回省去其餘歸約
+        logging.warning("近20根K線含有缺值，無法進行K線型態自動判斷，預設為『平衡』策略組合。")
+        return "balanced"
     if avg_candle_range == 0: 
         logging.info("近20根K線平均K棒長度為零，判斷為極端平靜，預設為『平衡』策略組合。")
         return "balanced"
 
-    high_20_period = df['high'].iloc[-20:].max()
-    low_20_period = df['low'].iloc[-20:].min()
+    high_20_period = high_20.max()
+    low_20_period = low_20.min()
     price_range_20_period = high_20_period - low_20_period
 
     if price_range_20_period / avg_candle_range > 3.0:
@@ -159,8 +253,28 @@ class MultiSymbolTrader:
         """
         初始化多幣種交易機器人
         """
+        # 餘額短期緩存 (餘額, monotonic 時間戳)，避免同一週期內重複請求交易所
+        self._balance_cache = (0.0, float('-inf'))
+        self.balance_cache_ttl = 1.0
+
+        # K 線短期緩存 {(symbol, interval, limit): (DataFrame, monotonic 時間戳)}，
+        # 讓同一週期內開倉判斷與平倉檢查共用同一次請求；每個交易週期開始時清空
+        self._kline_cache = {}
+        # 跨週期保留的 K 線滾動窗口 {(symbol, interval, limit): (時間戳陣列, OHLCV 陣列)}，
+        # 之後只抓取最近幾根 K 線與窗口合併，不必每次重新下載整段歷史
+        self._kline_frames = {}
+        self.kline_cache_ttl = 5.0
+        # 跨週期共用的 K 線抓取執行緒池，同時進行的請求數上限為 max_workers，不必每個週期重建執行緒
+        self._kline_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='kline-fetch')
+
         # 初始化配置緩存
         self.configs = {}
+        # 尚未解析的 list/dict 配置原始字串，首次讀取時才解析
+        self._configs_raw = {}
+        # 配置緩存有效期（秒），過期後整表重新載入一次；記錄來自數據庫的鍵以便失效時清除
+        self.config_cache_ttl = 5.0
+        self._configs_loaded_at = float('-inf')
+        self._db_config_keys = set()
         
         # 初始化基本屬性
         self.enable_trade_limits = True
@@ -228,6 +342,8 @@ class MultiSymbolTrader:
         
         # 配置自動同步相關變量
         self.last_config_check = timezone.now()
+        # 間隔判斷使用 monotonic 時鐘，未到期時只需一次浮點數比較
+        self._last_config_check_mono = time.monotonic()
         self.config_sync_interval = 300  # 5分鐘檢查一次配置變化
         self.auto_sync_symbols = self.get_config('AUTO_SYNC_SYMBOLS', type=bool, default=True)
         
@@ -257,13 +373,13 @@ class MultiSymbolTrader:
                 logging.warning("交易所客戶端不支持時間同步，將使用本地時間。")
         except Exception as e:
             logging.warning(f"與交易所校時失敗: {e}，將使用本地時間。")
-       
-        # 全局交易判斷頻率
-        self.global_interval_seconds = self.get_config('GLOBAL_INTERVAL_SECONDS', type=int, default=3)
 
-        # 每小時與每日允許的最大開倉次數
-        self.max_trades_per_hour = self.get_config('MAX_TRADES_PER_HOUR', type=int, default=5)
-        self.max_trades_per_day = self.get_config('MAX_TRADES_PER_DAY', type=int, default=100)
+        # 啟動 websocket 行情推送，讓 get_current_price 不必每次走 REST
+        if hasattr(self.client, 'start_price_stream'):
+            self.client.start_price_stream(self.symbols)
+       
+        # 全局交易判斷頻率、每小時與每日允許的最大開倉次數等主迴圈配置
+        # 由 _cache_hot_configs 綁定為實例屬性，每次重新載入配置時同步更新
 
         # 波動率風險調整配置
         self.enable_volatility_risk_adjustment = self.get_config('ENABLE_VOLATILITY_RISK_ADJUSTMENT', type=bool, default=True)
@@ -273,14 +389,14 @@ class MultiSymbolTrader:
         self.volatility_pause_duration_minutes = self.get_config('VOLATILITY_PAUSE_DURATION_MINUTES', type=int, default=30)
         
         # 波動率暫停狀態
-        self.volatility_pause_status = {}
-        for symbol in self.symbols:
-            self.volatility_pause_status[symbol] = {
-                'is_paused': False,
-                'pause_start_time': None,
-                'pause_reason': None,
-                'current_atr_ratio': 1.0
-            }
+        self.volatility_pause_status = {symbol: dict(_VOLATILITY_PAUSE_DEFAULTS) for symbol in self.symbols}
+        # 各幣種的 VolatilityPauseStatus 記錄只載入一次；ATR 比率變動先標記為待寫回，
+        # 暫停/恢復狀態切換於週期結束時批次寫入，其餘每 volatility_status_flush_interval 秒批次寫回
+        self._volatility_status_objs = {}
+        self._volatility_status_dirty = set()
+        self._volatility_transitions = set()
+        self.volatility_status_flush_interval = 60  # 秒
+        self._volatility_status_flushed_at = time.monotonic()
         
         # 最大同時持倉數量限制配置
         self.enable_max_position_limit = self.get_config('ENABLE_MAX_POSITION_LIMIT', type=bool, default=True)
@@ -297,19 +413,14 @@ class MultiSymbolTrader:
         }
 
         # 初始化持倉狀態
-        self.positions = {
-            symbol: {
-                'active': False,
-                'side': None,
-                'entry_price': None,
-                'quantity': 0.0,
-            } for symbol in self.symbols
-        }
+        self.positions = {symbol: dict(_POSITION_DEFAULTS) for symbol in self.symbols}
 
         self.stop_signal = False
         self.trading_enabled = True
         self.cooldown_flags = {symbol: False for symbol in self.symbols}
         self.last_trade_time = {symbol: None for symbol in self.symbols}
+        # 各幣種數量精度對應的縮放倍數 (10 ** 精度)，新增的幣種於首次下單時補上
+        self._quantity_scales = {symbol: 10 ** get_precision(symbol) for symbol in self.symbols}
         
         # --- 從 StrategyCombo 載入啟用的組合包模式和自定義策略 ---
         self.active_combo_mode = 'balanced' # 預設為平衡
@@ -332,35 +443,84 @@ class MultiSymbolTrader:
 
         except Exception as e:
             logging.error(f"從數據庫載入 StrategyCombo 失敗: {e}，將使用預設的『平衡』模式。")
+
+        # 平倉記帳寫入佇列，於交易週期結束時由 _flush_post_cycle_writes 寫回
+        self._post_cycle_writes = []
+
+        # 自動判斷模式的組合包緩存：{symbol: (最後 K 線時間戳, 組合包名稱)}
+        self._combo_cache = {}
+
+        # 交易信號緩存：{symbol: ((組合包模式, K 線數量, 最後 K 線時間戳, 最後一根 OHLCV), 信號)}
+        # 交易週期遠比 K 線週期頻繁，同一根 K 線且數值未變動時直接沿用上次的信號
+        self._signal_cache = {}
+
+        # 技術指標緩存：同一根 K 線（含其最新 OHLCV）只計算一次，保留最近 indicator_cache_size 筆
+        self._indicator_cache = OrderedDict()
+        self.indicator_cache_size = 64
+        # 指標遞推狀態：{(symbol, interval): (K 線數量, 最後 K 線時間戳, 前一根 (high, low, close), 前一根為止的狀態, 指標陣列)}
+        # 只有正在形成的最後一根 K 線變動時，從前一根的狀態續算，不必重新走訪整個窗口
+        self._indicator_states = {}
+
+        # 自定義模式的策略清單預先解析為函數元組，僅在清單變更時重新解析
+        self._set_custom_strategies(self.custom_strategies_list)
         
         # 初始化當日起始資金
         self.initialize_start_balance()
 
         # 初始化用於儲存每個幣種歷史平均 ATR 的字典
         self.average_atrs = {}
+        # 以單次查詢載入既有的交易對，取出上次保存的平均 ATR 遞推狀態，
+        # 有狀態的幣種只需抓取之後新收盤的 K 線即可更新平均 ATR
+        existing_pairs = {p.symbol: p for p in TradingPair.objects.filter(symbol__in=self.symbols)}
+        self._atr_states = {symbol: p.atr_state for symbol, p in existing_pairs.items() if p.atr_state}
         # 為每個交易幣種計算歷史平均 ATR 作為波動性參考值
         # 從數據庫獲取 SYMBOL_INTERVALS
         symbol_intervals_config = self.get_config('SYMBOL_INTERVALS', type=dict, default={})
 
-        for symbol in self.symbols:
-            # 獲取幣種對應的交易間隔
-            interval = symbol_intervals_config.get(symbol, "1m") # 使用從數據庫讀取的配置
-            # 呼叫內部方法計算平均 ATR
-            avg_atr = self._calculate_average_historical_atr(symbol, interval)
+        # 各幣種的歷史 K 線抓取互不相關，以執行緒池並行計算平均 ATR
+        with ThreadPoolExecutor(max_workers=max(1, min(8, len(self.symbols)))) as executor:
+            avg_atr_results = dict(zip(self.symbols, executor.map(
+                # 使用從數據庫讀取的幣種交易間隔
+                lambda s: self._calculate_average_historical_atr(s, symbol_intervals_config.get(s, "1m")),
+                self.symbols
+            )))
+
+        for symbol, avg_atr in avg_atr_results.items():
             if avg_atr is not None:
                 self.average_atrs[symbol] = avg_atr
-                TradingPair.objects.update_or_create(
-                    symbol=symbol,
-                    defaults={'average_atr': avg_atr}
-                )
             else:
                 logging.warning(f"無法計算 {symbol} 的歷史平均 ATR。")
 
-        # 從數據庫載入 TradingPair 的配置，包括上次交易時間和連續止損次數
-        for symbol in self.symbols:
-            trading_pair_instance, created = TradingPair.objects.get_or_create(symbol=symbol)
-            if not created: # 如果是已存在的 TradingPair
-                self.last_trade_time[symbol] = trading_pair_instance.last_trade_time
+        # 以批次寫入取代逐筆 update_or_create
+        pairs_to_update = []
+        pairs_to_create = []
+        for symbol, avg_atr in self.average_atrs.items():
+            trading_pair_instance = existing_pairs.get(symbol)
+            if trading_pair_instance is not None:
+                trading_pair_instance.average_atr = avg_atr
+                trading_pair_instance.atr_state = self._atr_states.get(symbol)
+                pairs_to_update.append(trading_pair_instance)
+            else:
+                pairs_to_create.append(TradingPair(symbol=symbol, average_atr=avg_atr, atr_state=self._atr_states.get(symbol)))
+        # 無法計算平均 ATR 的新幣種同樣建立交易對，與其他新交易對一併寫入
+        pairs_to_create.extend(
+            TradingPair(symbol=symbol) for symbol in self.symbols
+            if symbol not in existing_pairs and symbol not in self.average_atrs
+        )
+        if pairs_to_update:
+            TradingPair.objects.bulk_update(pairs_to_update, ['average_atr', 'atr_state'])
+        if pairs_to_create:
+            TradingPair.objects.bulk_create(pairs_to_create)
+
+        # 上次交易時間直接取自已載入的交易對，新建立的交易對維持 None
+        for symbol, trading_pair_instance in existing_pairs.items():
+            self.last_trade_time[symbol] = trading_pair_instance.last_trade_time
+
+        # 交易對快照：交易週期與每日重置共用，僅在配置同步時重新載入
+        self._refresh_trading_pairs_snapshot()
+
+        # 一次性預載所有幣種的波動率暫停狀態，交易週期內不再逐幣種查詢
+        self._preload_volatility_statuses()
 
         # 初始化新開發的功能模組
         self.trade_logger = TradeLogger()
@@ -397,6 +557,18 @@ class MultiSymbolTrader:
             logging.info(f"跳過自動設置槓桿，當前配置槓桿: {self.leverage}x")
             logging.info("如需手動設置槓桿，請調用 set_leverage() 方法")
 
+        # TraderStatus 計數器：開倉只累加內存中的待寫回增量，由背景執行緒以 F 表達式累加寫回數據庫，
+        # 不以內存中的絕對值覆寫，外部（reset_trade_counts 指令或後台）的重置因此不會被蓋掉
+        self.hourly_trade_count = 0
+        self.daily_trade_count = 0
+        self.last_hourly_reset = timezone.now()
+        self._status_lock = threading.Lock()
+        self._pending_hourly_trades = 0
+        self._pending_daily_trades = 0
+        self.status_flush_interval = 10  # 秒
+        self._status_flush_stop = threading.Event()
+        self._status_flush_thread = None
+
         # 載入 TraderStatus
         try:
             trader_status, created = TraderStatus.objects.get_or_create(pk=1) # 假設只有一個 TraderStatus 實例
@@ -409,15 +581,122 @@ class MultiSymbolTrader:
         except Exception as e:
             logging.error(f"從數據庫載入 TraderStatus 失敗: {e}，將使用預設狀態。")
 
+        self.start_status_flusher()
+
+        # 交易紀錄 CSV：交易執行緒只把紀錄放入內存佇列並喚醒背景執行緒，
+        # 由背景執行緒將佇列中累積的紀錄批次寫入長期開啟的緩衝檔案
+        self.trade_log_path = os.path.join("logs", "trade_log.csv")
+        self._trade_log_queue = deque()
+        self._trade_log_lock = threading.Lock()
+        self._trade_log_file = None
+        self._trade_log_writer = None
+        self._trade_log_wake = threading.Event()
+        self._trade_log_stop = threading.Event()
+        self._trade_log_thread = None
+        self.start_trade_log_writer()
+
+        # 行程結束時確保資源被清理（cleanup 可重複呼叫，僅第一次生效）
+        self._closed = False
+        atexit.register(self.cleanup)
+
+    def start_status_flusher(self):
+        """啟動 TraderStatus 計數器的背景寫回執行緒"""
+        if self._status_flush_thread is not None:
+            return
+        self._status_flush_stop.clear()
+        self._status_flush_thread = threading.Thread(target=self._flush_status_loop, daemon=True)
+        self._status_flush_thread.start()
+
+    def stop_status_flusher(self):
+        """停止背景寫回執行緒，並將尚未寫回的計數器立即寫入數據庫"""
+        self._status_flush_stop.set()
+        if self._status_flush_thread:
+            self._status_flush_thread.join(timeout=5)
+            self._status_flush_thread = None
+        self.flush_trader_status()
+
+    def _flush_status_loop(self):
+        """每 status_flush_interval 秒寫回一次有變動的計數器"""
+        try:
+            while not self._status_flush_stop.wait(self.status_flush_interval):
+                self.flush_trader_status()
+        finally:
+            # 背景執行緒持有獨立的數據庫連線，結束時關閉
+            connection.close()
+
+    def flush_trader_status(self):
+        """將尚未寫回的交易次數增量以 F 表達式累加到 TraderStatus（僅在有增量時）"""
+        with self._status_lock:
+            if not (self._pending_hourly_trades or self._pending_daily_trades):
+                return
+            try:
+                TraderStatus.objects.filter(pk=1).update(
+                    hourly_trade_count=F('hourly_trade_count') + self._pending_hourly_trades,
+                    daily_trade_count=F('daily_trade_count') + self._pending_daily_trades,
+                )
+                self._pending_hourly_trades = 0
+                self._pending_daily_trades = 0
+            except Exception as e:
+                logging.error(f"寫回 TraderStatus 失敗: {e}")
+
+    def start_trade_log_writer(self):
+        """啟動交易紀錄 CSV 的背景批次寫入執行緒"""
+        if self._trade_log_thread is not None:
+            return
+        self._trade_log_stop.clear()
+        self._trade_log_thread = threading.Thread(target=self._trade_log_loop, daemon=True)
+        self._trade_log_thread.start()
+
+    def stop_trade_log_writer(self):
+        """停止背景寫入執行緒，寫入剩餘紀錄並關閉檔案"""
+        self._trade_log_stop.set()
+        self._trade_log_wake.set()
+        if self._trade_log_thread:
+            self._trade_log_thread.join(timeout=5)
+            self._trade_log_thread = None
+        self.flush_trade_log()
+        with self._trade_log_lock:
+            if self._trade_log_file is not None:
+                self._trade_log_file.close()
+                self._trade_log_file = None
+                self._trade_log_writer = None
+
+    def _trade_log_loop(self):
+        """有新紀錄時被喚醒，一次寫入佇列中已累積的所有紀錄；無交易時不會輪詢"""
+        while True:
+            self._trade_log_wake.wait()
+            self._trade_log_wake.clear()
+            if self._trade_log_stop.is_set():
+                return
+            self.flush_trade_log()
+
+    def flush_trade_log(self):
+        """將佇列中的交易紀錄一次寫入 CSV（首次寫入時開啟檔案，空檔案先寫表頭）"""
+        with self._trade_log_lock:
+            if not self._trade_log_queue:
+                return
+            try:
+                if self._trade_log_file is None:
+                    os.makedirs(os.path.dirname(self.trade_log_path), exist_ok=True)
+                    self._trade_log_file = open(self.trade_log_path, mode='a', newline='', buffering=1 << 16)
+                    self._trade_log_writer = csv.writer(self._trade_log_file)
+                    # 表頭只在開檔時判斷一次：追加模式下位置為 0 表示檔案為空
+                    if self._trade_log_file.tell() == 0:
+                        self._trade_log_writer.writerow(_TRADE_LOG_HEADER)
+                batch = [self._trade_log_queue.popleft() for _ in range(len(self._trade_log_queue))]
+                self._trade_log_writer.writerows(batch)
+                self._trade_log_file.flush()
+            except Exception as e:
+                logging.error(f"寫入交易紀錄失敗: {e}")
+
     def _load_all_configs(self):
         """
         從 TraderConfig 模型載入所有配置到內存緩存。
         """
         try:
-            configs = TraderConfig.objects.all()
-            for config_item in configs:
-                key = config_item.key
-                value_str = config_item.value
+            # 只取鍵與值兩欄的元組，整表一次查詢且不建立模型實例
+            for key, value_str in TraderConfig.objects.values_list('key', 'value'):
+                self._db_config_keys.add(key)
                 
                 # 根據 CONFIG_FIELD_TYPES 進行類型轉換
                 field_type = CONFIG_FIELD_TYPES.get(key, str)
@@ -433,29 +712,116 @@ class MultiSymbolTrader:
                         self.configs[key] = float(value_str) if value_str else None
                     except ValueError:
                         self.configs[key] = None
-                elif field_type == list:
-                    try:
-                        self.configs[key] = json.loads(value_str) if value_str else []
-                    except json.JSONDecodeError:
-                        self.configs[key] = []
-                elif field_type == dict:
-                    try:
-                        self.configs[key] = json.loads(value_str) if value_str else {}
-                    except json.JSONDecodeError:
-                        self.configs[key] = {}
+                elif field_type in (list, dict):
+                    # JSON 配置延遲到首次讀取時才解析（見 _parse_raw_config）
+                    self._configs_raw[key] = (field_type, value_str)
                 else:
                     self.configs[key] = value_str
             logging.info("所有 TraderConfig 配置已從數據庫載入到內存緩存。")
         except Exception as e:
             logging.error(f"載入 TraderConfig 配置失敗: {e}")
 
+        self._configs_loaded_at = time.monotonic()
+        self._cache_hot_configs()
+
+    def _invalidate_config_cache(self):
+        """
+        使配置緩存失效並從數據庫重新載入。
+        只清除來自數據庫的鍵；不存在於數據庫而以預設值緩存的鍵保留，
+        若之後被寫入數據庫，重新載入時會被覆蓋。
+        """
+        for key in self._db_config_keys:
+            self.configs.pop(key, None)
+            self._configs_raw.pop(key, None)
+        self._db_config_keys = set()
+        self._load_all_configs()
+
+    def reload_configs(self):
+        """
+        立即從數據庫重新載入所有配置並更新綁定的實例屬性，
+        供後台修改配置後即時生效，不必等待緩存過期或重啟。
+        """
+        self._invalidate_config_cache()
+
+    def _cache_hot_configs(self):
+        """
+        將倉位計算與主迴圈熱路徑上的配置提升為實例屬性，避免每個週期/每次下單時重複查表。
+        RISK_LIMIT_TIERS 在此預先排序一次。
+        """
+        def _cached(key, default):
+            if key not in self.configs and key not in self._configs_raw:
+                return default
+            value = self.get_config(key)
+            return default if value is None else value
+
+        # 主迴圈每個週期使用的配置
+        self.global_interval_seconds = int(_cached('GLOBAL_INTERVAL_SECONDS', 3))
+        self.symbol_interval_seconds = _cached('SYMBOL_INTERVAL_SECONDS', {})
+        self.max_consecutive_stop_loss = int(_cached('MAX_CONSECUTIVE_STOP_LOSS', 3))
+        self.max_trades_per_hour = int(_cached('MAX_TRADES_PER_HOUR', 5))
+        self.max_trades_per_day = int(_cached('MAX_TRADES_PER_DAY', 100))
+
+        # 平倉檢查每次呼叫都會用到的配置，以不可變快照整份替換
+        self.cfg = TraderConfigSnapshot(
+            symbol_intervals=_cached('SYMBOL_INTERVALS', {}),
+            exit_mode=_cached('EXIT_MODE', "PERCENTAGE"),
+            price_take_profit_percent=float(_cached('PRICE_TAKE_PROFIT_PERCENT', 0.5)),
+            price_stop_loss_percent=float(_cached('PRICE_STOP_LOSS_PERCENT', 0.25)),
+            amount_take_profit_usdt=float(_cached('AMOUNT_TAKE_PROFIT_USDT', 10.0)),
+            amount_stop_loss_usdt=float(_cached('AMOUNT_STOP_LOSS_USDT', 5.0)),
+            atr_take_profit_multiplier=float(_cached('ATR_TAKE_PROFIT_MULTIPLIER', 1.5)),
+            atr_stop_loss_multiplier=float(_cached('ATR_STOP_LOSS_MULTIPLIER', 1.0)),
+            hybrid_min_take_profit_usdt=float(_cached('HYBRID_MIN_TAKE_PROFIT_USDT', 5.0)),
+            hybrid_max_take_profit_usdt=float(_cached('HYBRID_MAX_TAKE_PROFIT_USDT', 20.0)),
+            hybrid_min_stop_loss_usdt=float(_cached('HYBRID_MIN_STOP_LOSS_USDT', 3.0)),
+            hybrid_max_stop_loss_usdt=float(_cached('HYBRID_MAX_STOP_LOSS_USDT', 10.0)),
+            enable_trade_log=bool(_cached('ENABLE_TRADE_LOG', False)),
+        )
+
+        self.base_position_ratio = float(_cached('BASE_POSITION_RATIO', 0.01))
+        self.min_position_ratio = float(_cached('MIN_POSITION_RATIO', 0.005))
+        self.max_position_ratio = float(_cached('MAX_POSITION_RATIO', 0.05))
+        self.risk_limit_tiers_sorted = tuple(
+            sorted(tuple(tier) for tier in _cached('RISK_LIMIT_TIERS', [[100000, 20], [200000, 10]]))
+        )
+        # 依名義價值排序後的槓桿前綴最大值為單調遞增序列，
+        # 對其 bisect 即可得到「第一個允許目標槓桿的層級」
+        self._tier_notionals = tuple(tier[0] for tier in self.risk_limit_tiers_sorted)
+        self._tier_leverage_prefix_max = tuple(
+            accumulate((tier[1] for tier in self.risk_limit_tiers_sorted), max)
+        )
+        # 目標槓桿對應的名義價值上限只在槓桿或層級變動後重新查找：(槓桿, 名義價值上限)
+        self._max_notional_for_leverage = (None, float('inf'))
+
+    def _parse_raw_config(self, key: str):
+        """
+        解析並緩存 _load_all_configs 延遲保留的 list/dict 配置。
+        解析失敗時回退為空列表或空字典。
+        """
+        field_type, value_str = self._configs_raw.pop(key)
+        if not value_str:
+            value = field_type()
+        else:
+            try:
+                value = orjson.loads(value_str) if orjson else json.loads(value_str)
+            except ValueError:
+                value = field_type()
+        self.configs[key] = value
+        return value
+
     def get_config(self, key: str, type=str, default=None):
         """
         從緩存或數據庫中獲取交易配置。
         支持類型轉換和預設值。
+        緩存超過 config_cache_ttl 秒後整表重新載入一次。
         """
+        if time.monotonic() - self._configs_loaded_at >= self.config_cache_ttl:
+            self._invalidate_config_cache()
+
         if key in self.configs:
             return self.configs[key]
+        if key in self._configs_raw:
+            return self._parse_raw_config(key)
 
         try:
             config_entry = TraderConfig.objects.get(key=key)
@@ -477,8 +843,8 @@ class MultiSymbolTrader:
                     value = value_str
                 elif isinstance(value_str, str):
                     # 修正：只有明確的 true 值才返回 True
-                    value = value_str.strip().lower() in ['true', '1', 't', 'y', 'yes']
-                    logging.debug(f"布林值轉換: '{value_str}' -> {value}")
+                    stripped = value_str.strip()
+                    value = stripped in _TRUE_STRINGS or stripped.lower() in _TRUE_STRINGS
                 else:
                     value = bool(value_str)
             elif expected_type_str == 'list':
@@ -602,13 +968,17 @@ class MultiSymbolTrader:
         return int(time.time() * 1000) + self.time_offset
 
     def get_available_usdt_balance(self) -> float:
-        """安全地獲取可用的 USDT 餘額"""
+        """安全地獲取可用的 USDT 餘額（在 balance_cache_ttl 秒內重用上次結果）"""
+        cached_balance, fetched_at = self._balance_cache
+        if time.monotonic() - fetched_at < self.balance_cache_ttl:
+            return cached_balance
+
         try:
             # 假設 get_balance('USDT') 返回的是可用的U本位合約錢包餘額
             balance = self.client.get_balance('USDT')
-            if balance is None:
-                return 0.0
-            return float(balance)
+            balance = 0.0 if balance is None else float(balance)
+            self._balance_cache = (balance, time.monotonic())
+            return balance
         except Exception as e:
             logging.error(f"擷取 USDT 餘額失敗: {e}")
             return 0.0
@@ -626,40 +996,106 @@ class MultiSymbolTrader:
         """
         獲取歷史 K 線數據並轉換為 DataFrame
         Binance K線數據格式: [timestamp, open, high, low, close, volume, close_time, quote_asset_volume, number_of_trades, taker_buy_base_asset_volume, taker_buy_quote_asset_volume, ignore]
+        kline_cache_ttl 秒內以相同參數重複請求時直接回傳緩存結果；
+        跨週期保留滾動窗口，之後只抓取上次之後的幾根 K 線並合併
         """
+        cache_key = (symbol, interval, limit)
+        cached = self._kline_cache.get(cache_key)
+        if cached is not None and time.monotonic() - cached[1] < self.kline_cache_ttl:
+            return cached[0]
+
         try:
+            # 已有滾動窗口時，依經過的 K 線數量只抓取最近幾根（含正在形成的一根與前一根）
+            frame = self._kline_frames.get(cache_key)
+            interval_ms = _interval_to_ms(interval)
+            fetch_limit = limit
+            if frame is not None and interval_ms is not None:
+                new_bars = int((time.time() * 1000 - frame[0][-1]) // interval_ms)
+                if new_bars + 2 < limit:
+                    fetch_limit = max(new_bars, 0) + 2
+
             # client.fetch_klines 已經有了基本的錯誤處理
-            klines = self.client.fetch_klines(symbol, interval, limit)
-            
+            klines = self.client.fetch_klines(symbol, interval, fetch_limit)
+
             if not klines: # 如果返回空列表
                 logging.warning(f"{symbol}: 從交易所未獲取到 K 線數據。")
                 return pd.DataFrame()
 
-            # Binance K線數據有12列，我們只需要前6列
-            # 列定義: [timestamp, open, high, low, close, volume, close_time, quote_asset_volume, number_of_trades, taker_buy_base_asset_volume, taker_buy_quote_asset_volume, ignore]
-            df = pd.DataFrame(klines, columns=[
-                'timestamp', 'open', 'high', 'low', 'close', 'volume',
-                'close_time', 'quote_asset_volume', 'number_of_trades', 
-                'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore'
-            ])
-            
-            # 只保留我們需要的列
-            df = df[['timestamp', 'open', 'high', 'low', 'close', 'volume']]
-            
-            # 轉換數據類型
-            for col in ['open', 'high', 'low', 'close', 'volume']:
-                df[col] = pd.to_numeric(df[col])
-            
-            # 將 timestamp 轉為 datetime 物件，並設為 index
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            df.set_index('timestamp', inplace=True)
+            timestamps, ohlcv = self._parse_klines(klines)
+            if fetch_limit < limit:
+                merged = self._merge_kline_frame(frame, timestamps, ohlcv, limit)
+                if merged is None:
+                    # 與窗口之間有缺口，改為完整抓取
+                    klines = self.client.fetch_klines(symbol, interval, limit)
+                    if not klines:
+                        logging.warning(f"{symbol}: 從交易所未獲取到 K 線數據。")
+                        return pd.DataFrame()
+                    timestamps, ohlcv = self._parse_klines(klines)
+                else:
+                    timestamps, ohlcv = merged
+            self._kline_frames[cache_key] = (timestamps, ohlcv)
+
+            # 以欄優先 (Fortran) 排列建立單一 float64 區塊：pandas 2.x 直接沿用此陣列，
+            # 每一欄皆為連續記憶體，talib / numba 取用 to_numpy() 時不必再複製或跨步讀取
+            df = pd.DataFrame(np.asfortranarray(ohlcv), columns=['open', 'high', 'low', 'close', 'volume'])
             
+            # 下游只使用位置索引，不建立 DatetimeIndex，僅保留最後一根 K 線的時間戳（毫秒）
+            df.attrs['last_ts_ms'] = int(timestamps[-1])
+
+            self._kline_cache[cache_key] = (df, time.monotonic())
             return df
         
         except Exception as e:
             logging.error(f"{symbol} 擷取 K 線失敗: {e}")
             return pd.DataFrame()
 
+    @staticmethod
+    def _parse_klines(klines: list) -> tuple:
+        """
+        將交易所回傳的 K 線轉為 (開盤時間戳陣列, OHLCV float64 陣列)。
+        Binance K線數據有12列，我們只需要開盤時間與 open/high/low/close/volume 五列，
+        直接轉成單一 float64 陣列，避免建立 12 列物件表再逐列 to_numeric。
+        時間戳與 OHLCV 在同一次走訪中轉換（毫秒時間戳遠小於 2**53，以 float64 表示不失真），
+        並以欄優先排列配置，OHLCV 各欄皆為連續記憶體
+        """
+        parsed = np.array([kline[:6] for kline in klines], dtype=np.float64, order='F')
+        return parsed[:, 0].astype(np.int64), parsed[:, 1:]
+
+    @staticmethod
+    def _merge_kline_frame(frame: tuple, timestamps: np.ndarray, ohlcv: np.ndarray, limit: int) -> tuple | None:
+        """
+        以新抓取的 K 線覆蓋滾動窗口中時間戳相同的 K 線（正在形成的 K 線數值會變動）並追加新 K 線，
+        只保留最近 limit 根。新資料的第一根不在窗口內（中間有缺口）時回傳 None。
+        """
+        frame_timestamps, frame_ohlcv = frame
+        start = int(np.searchsorted(frame_timestamps, timestamps[0]))
+        if start >= len(frame_timestamps) or frame_timestamps[start] != timestamps[0]:
+            return None
+        merged_timestamps = np.concatenate((frame_timestamps[:start], timestamps))[-limit:]
+        merged_ohlcv = np.concatenate((frame_ohlcv[:start], ohlcv))[-limit:]
+        return merged_timestamps, merged_ohlcv
+
+    def fetch_klines_batch(self, symbols: list, interval: str = '1m', limit: int = 500) -> dict:
+        """
+        並行獲取多個幣種的歷史 K 線數據（網路 I/O 密集，使用執行緒池）
+        回傳：{symbol: DataFrame}，失敗的幣種對應空 DataFrame
+        """
+        return self.fetch_klines_for_pairs([(symbol, interval) for symbol in symbols], limit=limit)
+
+    def fetch_klines_for_pairs(self, pairs: list, limit: int = 500) -> dict:
+        """
+        以共用執行緒池同時抓取多個 (symbol, interval) 的 K 線，不同週期的幣種也在同一批並行請求
+        回傳：{symbol: DataFrame}，失敗的幣種對應空 DataFrame
+        """
+        if not pairs:
+            return {}
+
+        dfs = self._kline_executor.map(
+            lambda pair: self.fetch_historical_klines(pair[0], interval=pair[1], limit=limit),
+            pairs
+        )
+        return {symbol: df for (symbol, _), df in zip(pairs, dfs)}
+
     def precompute_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         在 DataFrame 上計算常用技術指標
@@ -668,18 +1104,100 @@ class MultiSymbolTrader:
         if len(df) < 50:
             return df
 
-        df['ema_5'] = df['close'].ewm(span=5).mean()
-        df['ema_20'] = df['close'].ewm(span=20).mean()
+        # close/high/low 只轉換一次為連續的 float64 陣列，供融合核心或各 talib 指標共用
+        close = df['close'].to_numpy(dtype=np.float64)
+        high = df['high'].to_numpy(dtype=np.float64)
+        low = df['low'].to_numpy(dtype=np.float64)
 
-        df['rsi'] = talib.RSI(df['close'], timeperiod=14)
+        if NUMBA_AVAILABLE:
+            # 單次走訪 close/high/low 的融合核心，結果與下方 talib / pandas 路徑一致
+            ema_5, ema_20, rsi, macd, macd_signal, atr = fused_indicators(close, high, low)
+        else:
+            # EMA 保留 pandas ewm(adjust=True) 的定義，與 fused_indicators 及既有策略門檻一致；
+            # talib.EMA 以 SMA 起始且前段為 NaN，數值不同
+            close_series = df['close']
+            ema_5 = close_series.ewm(span=5).mean().to_numpy()
+            ema_20 = close_series.ewm(span=20).mean().to_numpy()
+            rsi = talib.RSI(close, timeperiod=14)
+            macd, macd_signal, _ = talib.MACD(
+                close, fastperiod=12, slowperiod=26, signalperiod=9)
+            atr = talib.ATR(high, low, close, timeperiod=14)
+
+        # 所有指標欄位以單次 assign 加入，避免逐欄插入造成多次區塊重組
+        df = df.assign(ema_5=ema_5, ema_20=ema_20, rsi=rsi, macd=macd, macd_signal=macd_signal, atr=atr)
+        # 記錄最新 ATR 與對應的 K 線數量，呼叫端直接讀取純量
+        df.attrs['last_atr'] = (len(df), float(atr[-1]))
+        return df
 
-        macd, macd_signal, _ = talib.MACD(
-            df['close'], fastperiod=12, slowperiod=26, signalperiod=9)
-        df['macd'] = macd
-        df['macd_signal'] = macd_signal
+    @staticmethod
+    def _last_atr(df: pd.DataFrame) -> float:
+        """
+        回傳最新一根 K 線的 ATR（呼叫前須確認 df 非空且含 atr 欄位）。
+        優先讀取 precompute_indicators 記錄的純量，K 線數量不符時才讀取 atr 欄位。
+        """
+        last_atr = df.attrs.get('last_atr')
+        if last_atr is not None and last_atr[0] == len(df):
+            return last_atr[1]
+        return df['atr'].to_numpy()[-1]
 
-        df['atr'] = talib.ATR(df['high'], df['low'], df['close'], timeperiod=14)
+    def _refresh_trading_pairs_snapshot(self):
+        """從數據庫重新載入所有 TradingPair 到記憶體快照"""
+        self._trading_pairs_snapshot = list(TradingPair.objects.all())
 
+    def _cached_indicators(self, symbol: str, interval: str, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        以 (symbol, interval, K 線數量, 最後 K 線時間戳, 最後一根 OHLCV) 緩存 precompute_indicators 的結果。
+        未收盤 K 線的價格仍會變動，因此鍵中包含最後一根的 OHLCV，數值變動即重新計算。
+        """
+        last_ts_ms = df.attrs.get('last_ts_ms')
+        if last_ts_ms is None or len(df) < 50:
+            return self.precompute_indicators(df)
+
+        last_bar = df[['open', 'high', 'low', 'close', 'volume']].to_numpy()[-1]
+        key = (symbol, interval, len(df), last_ts_ms, tuple(last_bar.tolist()))
+        cached = self._indicator_cache.get(key)
+        if cached is not None:
+            self._indicator_cache.move_to_end(key)
+            return cached
+
+        if NUMBA_AVAILABLE:
+            df = self._advance_indicators((symbol, interval), df, last_ts_ms)
+        else:
+            df = self.precompute_indicators(df)
+        self._indicator_cache[key] = df
+        if len(self._indicator_cache) > self.indicator_cache_size:
+            self._indicator_cache.popitem(last=False)
+        return df
+
+    def _advance_indicators(self, state_key: tuple, df: pd.DataFrame, last_ts_ms: int) -> pd.DataFrame:
+        """
+        以融合核心計算與 precompute_indicators 相同的指標欄位。
+        K 線數量與最後 K 線時間戳不變（窗口未滾動）且前一根 K 線相同時，
+        沿用前一根為止的遞推狀態，只重算正在形成的最後一根；否則完整走訪一次並保存狀態。
+        """
+        close = df['close'].to_numpy(dtype=np.float64)
+        high = df['high'].to_numpy(dtype=np.float64)
+        low = df['low'].to_numpy(dtype=np.float64)
+        n = len(close)
+        prev_bar = (high[-2], low[-2], close[-2])
+
+        saved = self._indicator_states.get(state_key)
+        if saved is not None and saved[0] == n and saved[1] == last_ts_ms and saved[2] == prev_bar:
+            state = saved[3].copy()
+            outputs = [values.copy() for values in saved[4]]
+        else:
+            state = np.zeros(FUSED_STATE_SIZE)
+            outputs = [np.empty(n), np.empty(n)] + [np.full(n, np.nan) for _ in range(4)]
+            fused_indicators_advance(close, high, low, 0, n - 1, state, *outputs)
+            # 保存副本：交給 DataFrame 的陣列之後不再被修改
+            self._indicator_states[state_key] = (
+                n, last_ts_ms, prev_bar, state.copy(), [values.copy() for values in outputs]
+            )
+        fused_indicators_advance(close, high, low, n - 1, n, state, *outputs)
+
+        ema_5, ema_20, rsi, macd, macd_signal, atr = outputs
+        df = df.assign(ema_5=ema_5, ema_20=ema_20, rsi=rsi, macd=macd, macd_signal=macd_signal, atr=atr)
+        df.attrs['last_atr'] = (n, float(atr[-1]))
         return df
 
     def calculate_position_size(self, symbol: str, price: float, df: pd.DataFrame) -> float:
@@ -695,81 +1213,66 @@ class MultiSymbolTrader:
         # 從預先計算好的平均 ATR 中獲取參考值
         atr_reference_value = self.average_atrs.get(symbol)
 
-        # 獲取最新的 ATR 值
-        if 'atr' not in df.columns or df['atr'].empty:
+        # 獲取最新的 ATR 值（直接讀取底層 numpy 陣列）
+        use_atr = True
+        current_ATR = float('nan')
+        if 'atr' not in df.columns or len(df) == 0:
              logging.warning(f"{symbol}: 無法取得當前 ATR 數據，使用基礎資金比例。")
-             dynamic_ratio = self.get_config('BASE_POSITION_RATIO', type=float, default=0.01)
+             use_atr = False
         elif atr_reference_value is None or atr_reference_value < 1e-9:
              logging.warning(f"{symbol}: 無效的 ATR 參考值，使用基礎資金比例。")
-             dynamic_ratio = self.get_config('BASE_POSITION_RATIO', type=float, default=0.01)
+             use_atr = False
         else:
-            # 獲取當前最新的 ATR 值
-            current_ATR = df['atr'].iloc[-1]
-
-            # 避免除以零或非常小的數
-            if current_ATR < 1e-9:
-                 # ATR 接近零，波動性極低，使用最大比例 (或者可以設定一個固定較高的比例)
-                 dynamic_ratio = self.get_config('MAX_POSITION_RATIO', type=float, default=0.05)
-            else:
-                 # 根據當前 ATR 相對於平均 ATR 參考值的比例計算動態比例
-                 # 比例計算邏輯：ATR 越大，計算出的 dynamic_ratio 越小；ATR 越小，dynamic_ratio 越大
-                 base_ratio = self.get_config('BASE_POSITION_RATIO', type=float, default=0.01)
-                 min_ratio = self.get_config('MIN_POSITION_RATIO', type=float, default=0.005)
-                 max_ratio = self.get_config('MAX_POSITION_RATIO', type=float, default=0.05)
-
-                 scale = atr_reference_value / current_ATR
-                 dynamic_ratio = base_ratio * scale
-
-                 # 確保動態比例在合理範圍內
-                 dynamic_ratio = max(min_ratio, min(max_ratio, dynamic_ratio))
-
-        logging.info(f"{symbol} 使用動態資金比例: {dynamic_ratio:.4f}")
-
-        # 根據資金比例計算出原始資金量，再計算原始下單數量
-        capital = available_balance * dynamic_ratio
-        raw_quantity = capital / price
+            current_ATR = self._last_atr(df)
 
         # === 考慮交易所風險限額 (階梯式槓桿) ===
-        # 獲取當前設定的槓桿倍數
+        # 根據目標槓桿，從風險限額 tiers 中查找對應的最大允許名義價值（找不到則為無限大）
         target_leverage = self.leverage # 這裡使用已從數據庫載入的 self.leverage
+        cached_leverage, max_notional_value_for_leverage = self._max_notional_for_leverage
+        if cached_leverage != target_leverage:
+            tier_index = bisect.bisect_left(self._tier_leverage_prefix_max, target_leverage)
+            if tier_index < len(self._tier_notionals):
+                max_notional_value_for_leverage = self._tier_notionals[tier_index]
+            else:
+                max_notional_value_for_leverage = float('inf')
+            self._max_notional_for_leverage = (target_leverage, max_notional_value_for_leverage)
 
-        # 從數據庫獲取風險限額 tiers
-        risk_limit_tiers = self.get_config('RISK_LIMIT_TIERS', type=list, default=[[100000, 20], [200000, 10]])
-
-        # 根據目標槓桿，從風險限額 tiers 中查找對應的最大允許名義價值
-        max_notional_value_for_leverage = float('inf') # 初始化為無限大
-        # 注意：RISK_LIMIT_TIERS 應該是從低到高排序的
-        for max_notional, max_leverage in sorted(risk_limit_tiers):
-             if target_leverage <= max_leverage:
-                 max_notional_value_for_leverage = max_notional
-                 break # 找到匹配的層級，跳出迴圈
+        # 最小交易量（這裡簡化處理，實際應從數據庫獲取或查詢交易所信息）
+        min_quantity = 0.001
 
-        # 計算原始下單數量的名義價值 (數量 * 價格)
-        raw_notional_value = raw_quantity * price
+        # 動態資金比例、名義價值上限與最小交易量的數值計算交由編譯核心完成
+        dynamic_ratio, final_quantity, raw_notional_value = position_size(
+            float(available_balance), float(price), float(current_ATR),
+            float(atr_reference_value) if use_atr else 0.0, use_atr,
+            float(self.base_position_ratio), float(self.min_position_ratio), float(self.max_position_ratio),
+            float(max_notional_value_for_leverage), min_quantity
+        )
 
-        # 比較原始名義價值與設定槓桿允許的最大名義價值
-        final_quantity = raw_quantity
+        logging.info(f"{symbol} 使用動態資金比例: {dynamic_ratio:.4f}")
         if raw_notional_value > max_notional_value_for_leverage:
-             # 如果超出限制，按比例縮減下單數量
-             # 縮減後的數量 = (允許的最大名義價值 / 當前價格)
-             final_quantity = max_notional_value_for_leverage / price
              logging.warning(f"{symbol}: 計算出的名義價值 ({raw_notional_value:.2f}) 超出 {target_leverage}x 槓桿允許的上限 ({max_notional_value_for_leverage:.2f})，下單數量將縮減。")
-
-        # 確保最終下單數量符合最小交易量要求（這裡簡化處理，實際應查詢交易所的最小交易量）
-        # 可以根據需要添加更精確的最小交易量檢查
-        min_quantity = 0.001 # 假設一個非常小的最小交易量，實際應從數據庫獲取或交易所信息
-        if final_quantity < min_quantity:
-            final_quantity = 0.0
+        if final_quantity == 0.0:
             logging.warning(f"{symbol}: 最終計算出的下單數量 ({final_quantity}) 小於最小交易量 ({min_quantity})，將不下單。")
 
-        # 根據幣種精度進行四捨五入
-        precision = get_precision(symbol)
-        return round(final_quantity, precision)
+        # 依幣種精度向下取整到交易所允許的最小數量單位，避免四捨五入後超出名義價值上限；
+        # 加上極小值以吸收浮點誤差（例如 0.29 * 1000 = 289.99999999999997）
+        scale = self._quantity_scales.get(symbol)
+        if scale is None:
+            scale = self._quantity_scales[symbol] = 10 ** get_precision(symbol)
+        quantity = math.floor(final_quantity * scale + 1e-9) / scale
+        # 最小交易量不一定是數量單位的整數倍，向下取整後須再確認未低於最小交易量
+        if quantity < min_quantity:
+            if final_quantity != 0.0:
+                logging.warning(f"{symbol}: 依精度取整後的下單數量 ({quantity}) 小於最小交易量 ({min_quantity})，將不下單。")
+            return 0.0
+        return quantity
 
     def generate_combo_signal(self, df: pd.DataFrame, strategies: list) -> int:
         """
         根據傳入的策略清單生成交易訊號。
         只要策略清單中任何一個策略給出明確信號，就回傳該信號。
+        策略已於註冊時由 _validate_strategies 試跑驗證，此處不再逐次捕捉例外；
+        非預期的例外由交易週期中逐幣種的錯誤處理記錄並跳過該幣種。
         """
         if df.empty:
             logging.info("K線數據為空，無法生成組合信號。")
@@ -780,52 +1283,129 @@ class MultiSymbolTrader:
             return 0
 
         for strategy_func in strategies:
-            try:
-                signal = strategy_func(df)
-                if signal != 0:
-                    logging.info(f"符合策略：{strategy_func.__name__}，信號: {signal}")
-                    return signal
-            except Exception as e:
-                logging.error(f"執行策略 {strategy_func.__name__} 失敗: {e}")
+            signal = strategy_func(df)
+            if signal != 0:
+                logging.info(f"符合策略：{strategy_func.__name__}，信號: {signal}")
+                return signal
         
         logging.info("所有策略未達共識，維持觀望 HOLD")
         return 0
 
-    def generate_signal(self, df: pd.DataFrame) -> int:
+    def _resolve_custom_strategies(self, strategy_items) -> tuple:
+        """
+        將自定義策略清單（{'type': 'strategy_name'} 字典）解析為策略函數元組，
+        未知或格式錯誤的項目會被跳過。
+        """
+        strategies = []
+        for strategy_item in strategy_items or []:
+            strategy_name = strategy_item.get('type') if isinstance(strategy_item, dict) else None
+            if strategy_name:
+                strategy_func = ALL_STRATEGIES_MAP.get(strategy_name)
+                if strategy_func:
+                    strategies.append(strategy_func)
+                else:
+                    logging.warning(f"自定義策略清單中包含未知的策略: {strategy_name}，已跳過。")
+            else:
+                logging.warning(f"自定義策略清單中包含格式錯誤的項目: {strategy_item}，已跳過。")
+        return tuple(strategies)
+
+    def _set_custom_strategies(self, strategy_items):
+        """
+        更新自定義策略清單，並預先解析出要執行的策略函數與其名稱。
+        非自定義模式時不需要解析。
+        """
+        self.custom_strategies_list = strategy_items
+        # 策略清單或模式變動後，已緩存的信號不再適用
+        self._signal_cache.clear()
+        if self.active_combo_mode == 'custom':
+            self._active_callables = self._validate_strategies(self._resolve_custom_strategies(strategy_items))
+        else:
+            self._active_callables = ()
+        self._active_callable_names = [func.__name__ for func in self._active_callables]
+        # 自定義模式的日誌訊息只在策略清單變動時組成一次，不必每個週期重新格式化
+        self._custom_mode_log = f"『自定義模式』將執行：{self._active_callable_names}。"
+
+    def _validate_strategies(self, strategies: tuple) -> tuple:
+        """
+        以一份合成的 K 線（含 precompute_indicators 產生的指標欄位）試跑每個策略，
+        剔除在格式正確的數據上仍拋出例外的策略（例如依賴不存在的欄位），
+        避免它們在每個週期、每個幣種都拋例外並記錄錯誤。
+        """
+        if not strategies:
+            return strategies
+        rng = np.random.default_rng(0)
+        close = 100 + np.cumsum(rng.normal(0, 1, 200))
+        sample_df = self.precompute_indicators(pd.DataFrame({
+            'open': close + rng.normal(0, 0.5, 200),
+            'high': close + 1.0,
+            'low': close - 1.0,
+            'close': close,
+            'volume': rng.uniform(1.0, 100.0, 200),
+        }))
+
+        validated = []
+        for strategy_func in strategies:
+            try:
+                strategy_func(sample_df)
+            except Exception as e:
+                logging.warning(f"策略 {strategy_func.__name__} 試跑失敗: {e}，已從自定義策略中移除。")
+                continue
+            validated.append(strategy_func)
+        return tuple(validated)
+
+    def _detect_combo_cached(self, df: pd.DataFrame, symbol: str = None) -> str:
+        """
+        以 (symbol, 最後一根 K 線時間戳) 緩存 auto_detect_combo 的結果，
+        同一根 K 線內的重複呼叫直接回傳上次判斷的組合包。
+        """
+        last_ts_ms = df.attrs.get('last_ts_ms')
+        if symbol is None or last_ts_ms is None:
+            return auto_detect_combo(df)
+
+        cached = self._combo_cache.get(symbol)
+        if cached is not None and cached[0] == last_ts_ms:
+            return cached[1]
+
+        determined_style = auto_detect_combo(df)
+        self._combo_cache[symbol] = (last_ts_ms, determined_style)
+        return determined_style
+
+    def generate_signal(self, df: pd.DataFrame, symbol: str = None) -> int:
         """
         根據 StrategyCombo 中設定的組合包模式，獲取並執行對應的策略組合。
+        傳入 symbol 時，自動判斷模式會按 K 線緩存組合包判斷結果，
+        且同一根 K 線的 OHLCV 未變動時直接回傳上次的信號。
         """
         if df.empty:
             logging.info("K線數據為空，無法生成交易信號。")
             return 0
 
-        # 從實例變數獲取當前啟用的策略模式和自定義策略清單
+        # 從實例變數獲取當前啟用的策略模式
         current_combo_mode = self.active_combo_mode
-        current_custom_strategies = self.custom_strategies_list
+
+        # 未收盤 K 線的價格仍會變動，鍵中包含最後一根的 OHLCV，與指標緩存相同
+        cache_key = None
+        last_ts_ms = df.attrs.get('last_ts_ms')
+        if symbol is not None and last_ts_ms is not None:
+            last_bar = df[['open', 'high', 'low', 'close', 'volume']].to_numpy()[-1]
+            cache_key = (current_combo_mode, len(df), last_ts_ms, tuple(last_bar.tolist()))
+            cached = self._signal_cache.get(symbol)
+            if cached is not None and cached[0] == cache_key:
+                return cached[1]
         
         signal = 0
         selected_mode_log = ""
 
         if current_combo_mode == 'auto':
             # 自動判斷模式
-            determined_style = auto_detect_combo(df)
+            determined_style = self._detect_combo_cached(df, symbol)
             selected_mode_log = f"『自動判斷模式』選擇了：【{determined_style.upper()}】組合包。"
             signal = evaluate_bundles(df, determined_style) # 使用 evaluate_bundles 執行自動判斷出的風格
         elif current_combo_mode == 'custom':
-            # 自定義模式
-            strategies_to_execute = []
-            for strategy_item in current_custom_strategies: # custom_strategies_list 包含 {'type': 'strategy_name'} 字典
-                strategy_name = strategy_item.get('type')
-                if strategy_name:
-                    strategy_func = ALL_STRATEGIES_MAP.get(strategy_name)
-                    if strategy_func:
-                        strategies_to_execute.append(strategy_func)
-                    else:
-                        logging.warning(f"自定義策略清單中包含未知的策略: {strategy_name}，已跳過。")
-                else:
-                    logging.warning(f"自定義策略清單中包含格式錯誤的項目: {strategy_item}，已跳過。")
+            # 自定義模式：使用初始化時預先解析好的策略函數
+            strategies_to_execute = self._active_callables
 
-            selected_mode_log = f"『自定義模式』將執行：{[func.__name__ for func in strategies_to_execute]}。"
+            selected_mode_log = self._custom_mode_log
             if strategies_to_execute:
                 signal = self.generate_combo_signal(df, strategies_to_execute) # 使用 generate_combo_signal 執行自定義策略列表
             else:
@@ -842,6 +1422,8 @@ class MultiSymbolTrader:
 
         logging.info(selected_mode_log + f" 最終信號: {signal}")
 
+        if cache_key is not None:
+            self._signal_cache[symbol] = (cache_key, signal)
         return signal
 
     def place_order(self, symbol: str, side: str, quantity: float):
@@ -861,11 +1443,17 @@ class MultiSymbolTrader:
             return mock_order
 
         try:
+            # 市價單回報可能不含成交價，取價請求與下單請求並行送出以重疊網路延遲；
+            # 取價交由常駐的 K 線抓取執行緒池執行，下單路徑上不必建立與回收執行緒
+            price_future = self._kline_executor.submit(self.get_current_price, symbol)
             order = self.client.place_order(symbol, side, quantity)
+            fetched_price = price_future.result()
             logging.info(f"下單成功: {order}")
+            # 下單後餘額已變動，使緩存失效
+            self._balance_cache = (0.0, float('-inf'))
             
-            # 獲取準確的進場價和數量
-            entry_price = float(order.get('price') or self.get_current_price(symbol))
+            # 獲取準確的進場價和數量（回報價格為 0 時改用並行取得的市價）
+            entry_price = float(order.get('price') or 0) or float(fetched_price or 0)
             filled_quantity = float(order.get('filled') or order.get('amount') or quantity)
 
             # 立即更新倉位狀態
@@ -893,229 +1481,361 @@ class MultiSymbolTrader:
         if not current['active']:
             return
 
-        reverse_side = SIDE_SELL if current['side'] == SIDE_BUY else SIDE_BUY
+        reverse_side = REVERSE_SIDE.get(current['side'], SIDE_BUY)
         self.place_order(symbol, reverse_side, quantity)
 
     def run_trading_cycle(self):
         """
         主策略運行邏輯：每個幣種檢查 → 產生信號 → 下單或平倉
         """
+        # K 線緩存只在單一週期內共用，避免跨週期使用過期數據
+        self._kline_cache.clear()
+
+        # 熱路徑改讀實例屬性與配置快照後，由週期開始時檢查配置緩存是否過期
+        if time.monotonic() - self._configs_loaded_at >= self.config_cache_ttl:
+            self._invalidate_config_cache()
+
         # 🔍 檢查並同步配置變化
         if self.auto_sync_symbols:
             self.check_and_sync_configs()
         
-        trader_status = TraderStatus.objects.get(pk=1) # 獲取交易器狀態
+        # 獲取交易器狀態並同步交易計數器：持鎖讀取，使內存計數 = 數據庫值 + 尚未寫回的增量，
+        # 外部對計數器的重置因此在下個週期生效
+        with self._status_lock:
+            trader_status = TraderStatus.objects.only(
+                'is_trading_enabled', 'last_daily_reset_date',
+                'hourly_trade_count', 'daily_trade_count', 'last_hourly_reset',
+            ).get(pk=1)
+            self.hourly_trade_count = trader_status.hourly_trade_count + self._pending_hourly_trades
+            self.daily_trade_count = trader_status.daily_trade_count + self._pending_daily_trades
+            self.last_hourly_reset = trader_status.last_hourly_reset
 
-        # 每小時重置交易計數
+        # 本週期統一使用的時間戳與日期
         now_dt = timezone.now()
-        if now_dt - trader_status.last_hourly_reset >= timedelta(hours=1):
-            trader_status.hourly_trade_count = 0
-            trader_status.last_hourly_reset = now_dt
-            trader_status.save()
-            self.hourly_trade_count = 0
-            self.last_hourly_reset = now_dt
+        cycle_date = timezone.localdate(now_dt)
+
+        # 每小時重置交易計數（重置為絕對值，直接寫入數據庫並捨棄尚未寫回的每小時增量）
+        if now_dt - self.last_hourly_reset >= timedelta(hours=1):
+            with self._status_lock:
+                TraderStatus.objects.filter(pk=1).update(hourly_trade_count=0, last_hourly_reset=now_dt)
+                self.hourly_trade_count = 0
+                self.last_hourly_reset = now_dt
+                self._pending_hourly_trades = 0
             logging.info("每小時交易計數已重置")
 
         # 每日 0 點重新初始化資金與統計
-        now = timezone.localdate()
-        if trader_status.last_daily_reset_date != now:
+        if trader_status.last_daily_reset_date != cycle_date:
             self.reset_daily_state() # 重置每日狀態
 
+        # 一次性載入本週期所需的交易對、活躍持倉與今日 DailyStats，避免逐幣種查詢
+        trading_pairs = self._trading_pairs_snapshot
+        # 活躍持倉只取平倉判斷需要的欄位，供 check_exit_conditions 直接使用
+        active_positions = list(
+            Position.objects.filter(active=True).only('trading_pair_id', 'side', 'quantity', 'entry_price')
+        )
+        active_position_pair_id_list = [position.trading_pair_id for position in active_positions]
+        active_position_pair_ids = set(active_position_pair_id_list)
+        # 同一交易對有多筆活躍持倉時不放入映射，交由 check_exit_conditions 自行查詢（與原行為一致）
+        active_position_map = {}
+        for position in active_positions:
+            if position.trading_pair_id in active_position_map:
+                active_position_map[position.trading_pair_id] = None
+            else:
+                active_position_map[position.trading_pair_id] = position
+        # 活躍持倉數量以本週期載入的結果為準，供最大持倉數量限制使用
+        active_positions_count = len(active_position_pair_id_list)
+        daily_stats_map = {
+            stats.trading_pair_id: stats
+            for stats in DailyStats.objects.filter(date=cycle_date)
+        }
+
         if not trader_status.is_trading_enabled:
             logging.info("交易已暫停，只檢查平倉條件。")
-            for trading_pair_obj in TradingPair.objects.all():
-                # 僅檢查持倉的平倉條件
-                if Position.objects.filter(trading_pair=trading_pair_obj, active=True).exists():
-                    self.check_exit_conditions(trading_pair_obj.symbol)
-            # 從數據庫獲取全局的 interval_seconds
-            global_interval_seconds = self.get_config('GLOBAL_INTERVAL_SECONDS', type=int, default=3)
-            time.sleep(global_interval_seconds)
+            # 僅檢查持倉的平倉條件；需要 ATR 的平倉模式以平倉使用的週期並行預抓取 K 線並計算指標後傳入，
+            # 不在檢查內逐一抓取
+            exit_pairs = [p for p in trading_pairs if p.id in active_position_pair_ids]
+            exit_intervals = {p.symbol: self.cfg.symbol_intervals.get(p.symbol, "1m") for p in exit_pairs}
+            prefetched_klines = (
+                self.fetch_klines_for_pairs(list(exit_intervals.items()))
+                if self.cfg.exit_mode in ("ATR", "HYBRID") else {}
+            )
+            for trading_pair_obj in exit_pairs:
+                symbol = trading_pair_obj.symbol
+                interval = exit_intervals[symbol]
+                df = prefetched_klines.get(symbol)
+                if df is not None and not df.empty:
+                    df = self._cached_indicators(symbol, interval, df)
+                self.check_exit_conditions(
+                    symbol,
+                    trading_pair_obj=trading_pair_obj,
+                    daily_stats_obj=daily_stats_map.get(trading_pair_obj.id),
+                    df=df, df_interval=interval,
+                    position_obj=active_position_map.get(trading_pair_obj.id)
+                )
+            self._flush_post_cycle_writes()
+            time.sleep(self.global_interval_seconds)
             return
 
-        for trading_pair_obj in TradingPair.objects.all():
-            symbol = trading_pair_obj.symbol
-            interval = trading_pair_obj.interval # K線週期
-
-            # 若啟用交易次數限制，檢查是否達到每小時或每日開倉上限
-            if self.enable_trade_limits:
-                if (trader_status.hourly_trade_count >= self.max_trades_per_hour or
-                    trader_status.daily_trade_count >= self.max_trades_per_day):
-                    logging.info(f"已達全局開倉次數上限 (每小時: {trader_status.hourly_trade_count}/{self.max_trades_per_hour}, 每日: {trader_status.daily_trade_count}/{self.max_trades_per_day})，跳過開倉。")
-                    continue
-            
-            try:
-                # ⏱️ 根據設定跳過過快頻率
-                now_dt = timezone.now()
-                last_trade_time = trading_pair_obj.last_trade_time
-                # 從數據庫獲取 SYMBOL_INTERVAL_SECONDS
-                symbol_interval_seconds_config = self.get_config('SYMBOL_INTERVAL_SECONDS', type=dict, default={})
-                interval_sec = symbol_interval_seconds_config.get(symbol, self.global_interval_seconds) # 使用幣種特定的或全局的
-
-                if last_trade_time and (now_dt - last_trade_time) < timedelta(seconds=interval_sec):
-                    continue # 未達間隔秒數 → 跳過
-
-                # 更新最後交易時間
-                trading_pair_obj.last_trade_time = now_dt
-                trading_pair_obj.save() 
-
-                # cooldown: 若上輪剛止損達上限，跳過一次
-                max_consecutive_stop_loss = self.get_config('MAX_CONSECUTIVE_STOP_LOSS', type=int, default=3)
-                if trading_pair_obj.consecutive_stop_loss >= max_consecutive_stop_loss:
-                    logging.info(f"{symbol} 已達到連續止損上限 ({max_consecutive_stop_loss})，將 cooldown 並重置連續止損次數。")
-                    # 重置連續止損次數，但繼續 cooldown
-                    trading_pair_obj.consecutive_stop_loss = 0
-                    trading_pair_obj.save()
-                    continue
+        # 迴圈內不變的配置提前綁定為區域變數
+        symbol_interval_seconds_config = self.symbol_interval_seconds
+        max_consecutive_stop_loss = self.max_consecutive_stop_loss
+        enable_trade_limits = self.enable_trade_limits
+        max_trades_per_hour = self.max_trades_per_hour
+        max_trades_per_day = self.max_trades_per_day
+        # 本週期更新過 last_trade_time 的交易對，於週期結束時以 bulk_update 批次寫回
+        dirty_pairs = []
 
-                df = self.fetch_historical_klines(symbol, interval=interval)
+        # 所有交易對（不論 K 線週期）的 K 線在同一批並行預抓取
+        prefetched_klines = self.fetch_klines_for_pairs(
+            [(trading_pair_obj.symbol, trading_pair_obj.interval) for trading_pair_obj in trading_pairs]
+        )
 
-                if df.empty:
-                    continue
+        try:
+            for trading_pair_obj in trading_pairs:
+                symbol = trading_pair_obj.symbol
+                interval = trading_pair_obj.interval # K線週期
+
+                # 若啟用交易次數限制，檢查是否達到每小時或每日開倉上限
+                if enable_trade_limits:
+                    if (self.hourly_trade_count >= max_trades_per_hour or
+                        self.daily_trade_count >= max_trades_per_day):
+                        logging.info(f"已達全局開倉次數上限 (每小時: {self.hourly_trade_count}/{max_trades_per_hour}, 每日: {self.daily_trade_count}/{max_trades_per_day})，跳過開倉。")
+                        continue
+            
+                try:
+                    # ⏱️ 根據設定跳過過快頻率（以週期開始時間為準）
+                    last_trade_time = trading_pair_obj.last_trade_time
+                    interval_sec = symbol_interval_seconds_config.get(symbol, self.global_interval_seconds) # 使用幣種特定的或全局的
+
+                    if last_trade_time and (now_dt - last_trade_time) < timedelta(seconds=interval_sec):
+                        continue # 未達間隔秒數 → 跳過
+
+                    # 更新最後交易時間（週期結束時批次寫回）
+                    trading_pair_obj.last_trade_time = now_dt
+                    dirty_pairs.append(trading_pair_obj)
+
+                    # cooldown: 若上輪剛止損達上限，跳過一次
+                    if trading_pair_obj.consecutive_stop_loss >= max_consecutive_stop_loss:
+                        logging.info(f"{symbol} 已達到連續止損上限 ({max_consecutive_stop_loss})，將 cooldown 並重置連續止損次數。")
+                        # 重置連續止損次數，但繼續 cooldown（週期結束時寫回）
+                        trading_pair_obj.consecutive_stop_loss = 0
+                        self._post_cycle_writes.append(('stop_loss_count', trading_pair_obj, False))
+                        continue
 
-                df = self.precompute_indicators(df)
+                    df = prefetched_klines.get(symbol)
+                    if df is None:
+                        df = self.fetch_historical_klines(symbol, interval=interval)
 
-                required = ['ema_5', 'ema_20', 'rsi', 'macd', 'macd_signal', 'atr']
-                if not all(col in df.columns and not df[col].isna().all() for col in required):
-                    continue
+                    if df.empty:
+                        continue
 
-                # 檢查波動率風險調整
-                if not self.check_volatility_risk_adjustment(symbol, df):
-                    logging.info(f"{symbol}: 因波動率異常暫停交易")
-                    continue
+                    df = self._cached_indicators(symbol, interval, df)
 
-                # 檢查是否應該平倉 (包括止盈止損)
-                self.check_exit_conditions(symbol)
+                    # 任一指標欄位缺失或整欄皆為 NaN 則跳過：reindex 會以 NaN 補上缺失欄位，
+                    # 因此兩種情況都由同一次 numpy 檢查涵蓋
+                    indicator_values = df.reindex(columns=_REQUIRED_INDICATOR_COLUMNS).to_numpy(dtype=np.float64)
+                    if indicator_values.size == 0 or np.isnan(indicator_values).all(axis=0).any():
+                        continue
 
-                # 檢查是否觸發每日虧損熔斷
-                if self.should_trigger_circuit_breaker(symbol):
-                    logging.warning(f"{symbol} 觸發每日虧損熔斷，停止今日交易。")
-                    trader_status.is_trading_enabled = False # 設置全局交易狀態為禁用
-                    trader_status.save()
-                    return # 熔斷後立即退出主循環
+                    # 檢查波動率風險調整（波動率數值只計算一次，倉位調整時沿用）
+                    volatility_snapshot = (
+                        self._compute_volatility_snapshot(symbol, df)
+                        if self.enable_volatility_risk_adjustment else None
+                    )
+                    if not self.check_volatility_risk_adjustment(symbol, df, volatility_snapshot):
+                        logging.info(f"{symbol}: 因波動率異常暫停交易")
+                        continue
 
-                # 檢查是否有活躍持倉
-                active_position = Position.objects.filter(trading_pair=trading_pair_obj, active=True).first()
+                    daily_stats_obj = daily_stats_map.get(trading_pair_obj.id)
 
-                if active_position:
-                    # 如果有持倉，則等待 check_exit_conditions 處理平倉
-                    pass
-                else:
-                    # 沒有持倉，生成開倉信號
-                    # 重複檢查已在上方進行，這裡移除重複檢查
-                    # if (trader_status.hourly_trade_count >= self.max_trades_per_hour or
-                    #     trader_status.daily_trade_count >= self.max_trades_per_day):
-                    #     logging.info("已達全局開倉次數上限，跳過開倉。")
-                    #     continue
+                    # 檢查是否應該平倉 (包括止盈止損)
+                    if trading_pair_obj.id in active_position_pair_ids:
+                        exit_triggered = self.check_exit_conditions(
+                            symbol, trading_pair_obj=trading_pair_obj, daily_stats_obj=daily_stats_obj,
+                            df=df, df_interval=interval,
+                            position_obj=active_position_map.get(trading_pair_obj.id)
+                        )
+                        # 觸發平倉後重新確認持倉狀態，平倉成功則本輪可再評估開倉
+                        if exit_triggered and not Position.objects.filter(trading_pair=trading_pair_obj, active=True).exists():
+                            active_position_pair_ids.discard(trading_pair_obj.id)
+                            active_positions_count -= active_position_pair_id_list.count(trading_pair_obj.id)
+
+                    # 檢查是否觸發每日虧損熔斷
+                    if self.should_trigger_circuit_breaker(symbol, daily_stats_obj=daily_stats_obj):
+                        logging.warning(f"{symbol} 觸發每日虧損熔斷，停止今日交易。")
+                        # 設置全局交易狀態為禁用（只更新該欄位，避免覆寫尚未寫回的計數器）
+                        TraderStatus.objects.filter(pk=1).update(is_trading_enabled=False)
+                        return # 熔斷後立即退出主循環
+
+                    # 檢查是否有活躍持倉
+                    if trading_pair_obj.id in active_position_pair_ids:
+                        # 如果有持倉，則等待 check_exit_conditions 處理平倉
+                        pass
+                    else:
+                        # 沒有持倉，生成開倉信號
+                        # 重複檢查已在上方進行，這裡移除重複檢查
+                        # if (trader_status.hourly_trade_count >= self.max_trades_per_hour or
+                        #     trader_status.daily_trade_count >= self.max_trades_per_day):
+                        #     logging.info("已達全局開倉次數上限，跳過開倉。")
+                        #     continue
                     
-                    # 檢查最大同時持倉數量限制
-                    if not self.check_max_position_limit():
-                        logging.info(f"{symbol}: 已達到最大同時持倉數量限制，跳過開倉。")
-                        continue
+                        # 檢查最大同時持倉數量限制
+                        if not self.check_max_position_limit(active_positions_count):
+                            logging.info(f"{symbol}: 已達到最大同時持倉數量限制，跳過開倉。")
+                            continue
                     
-                    signal = self.generate_signal(df) # 這裡使用 generate_signal，它會根據組合模式來執行
-                    if signal == 0:
-                        continue
+                        signal = self.generate_signal(df, symbol) # 這裡使用 generate_signal，它會根據組合模式來執行
+                        if signal == 0:
+                            continue
                     
-                    # 稽核層處理信號
-                    if hasattr(self, 'audit_integration') and self.audit_integration:
-                        audit_result = self.audit_integration.process_trading_signal(
-                            signal, symbol, df, f"combo_{self.active_combo_mode}"
-                        )
-                        if not audit_result['approved']:
-                            logging.info(f"{symbol} 稽核層拒絕信號: {audit_result['reason']}")
+                        # 稽核層處理信號
+                        if hasattr(self, 'audit_integration') and self.audit_integration:
+                            audit_result = self.audit_integration.process_trading_signal(
+                                signal, symbol, df, f"combo_{self.active_combo_mode}"
+                            )
+                            if not audit_result['approved']:
+                                logging.info(f"{symbol} 稽核層拒絕信號: {audit_result['reason']}")
+                                continue
+                            signal = audit_result['signal']  # 使用稽核後的信號
+
+                        price = df['close'].iat[-1]
+                        if price is None:
+                            logging.warning(f"{symbol} 無法獲取當前價格，跳過本次下單。")
                             continue
-                        signal = audit_result['signal']  # 使用稽核後的信號
 
-                    price = df['close'].iloc[-1]
-                    if price is None:
-                        logging.warning(f"{symbol} 無法獲取當前價格，跳過本次下單。")
-                        continue
-
-                    # 計算基礎倉位大小
-                    base_qty = self.calculate_position_size(symbol, price, df)
+                        # 計算基礎倉位大小
+                        base_qty = self.calculate_position_size(symbol, price, df)
                     
-                    # 根據波動率調整倉位大小
-                    final_qty = self.adjust_position_size_by_volatility(symbol, base_qty, df)
+                        # 根據波動率調整倉位大小
+                        final_qty = self.adjust_position_size_by_volatility(symbol, base_qty, df, volatility_snapshot)
 
-                    if final_qty <= 0:
-                        logging.info(f"{symbol} 計算出的下單量為零或負數 ({final_qty})，跳過下單。")
-                        continue
+                        if final_qty <= 0:
+                            logging.info(f"{symbol} 計算出的下單量為零或負數 ({final_qty})，跳過下單。")
+                            continue
 
-                    side = SIDE_BUY if signal == 1 else SIDE_SELL
-                    
-                    # 記錄訂單提交事件
-                    if hasattr(self, 'audit_integration') and self.audit_integration:
-                        order_data = {
-                            'order_id': f"order_{int(time.time()*1000)}",
+                        side = SIGNAL_TO_SIDE.get(signal, SIDE_SELL)
+                        # 本筆訂單的備用 ID 與冪等鍵只生成一次，提交/成交/拒絕事件共用
+                        order_ts_ms = int(time.time() * 1000)
+                        fallback_order_id = f"order_{order_ts_ms}"
+                        idempotency_key = f"{symbol}_{side}_{order_ts_ms // 1000}"
+                        strategy_id = f"combo_{self.active_combo_mode}"
+                        audit_enabled = hasattr(self, 'audit_integration') and self.audit_integration
+                        # 稽核事件共用的欄位只建立一次，各事件僅補上差異欄位
+                        audit_base = {
+                            'order_id': fallback_order_id,
                             'side': side,
-                            'quantity': final_qty,
-                            'price': price,
-                            'order_type': 'market',
-                            'strategy_id': f"combo_{self.active_combo_mode}",
-                            'idempotency_key': f"{symbol}_{side}_{int(time.time())}"
+                            'strategy_id': strategy_id,
+                            'idempotency_key': idempotency_key
                         }
-                        self.audit_integration.log_order_event("submitted", order_data, symbol)
                     
-                    order = self.place_order(symbol, side, final_qty)
+                        # 記錄訂單提交事件
+                        if audit_enabled:
+                            self.audit_integration.log_order_event("submitted", {
+                                **audit_base,
+                                'quantity': final_qty,
+                                'price': price,
+                                'order_type': 'market'
+                            }, symbol)
+                    
+                        order = self.place_order(symbol, side, final_qty)
                     
-                    # 記錄交易日誌
-                    if order:
-                        try:
-                            # 獲取當前價格作為成交價
-                            current_price = self.get_current_price(symbol)
+                        # 記錄交易日誌
+                        if order:
+                            try:
+                                # 以 place_order 記錄的進場價作為成交價，無效時才重新取價
+                                current_price = self.positions[symbol]['entry_price'] or self.get_current_price(symbol)
                             
-                            # 記錄稽核層訂單成交事件
-                            if hasattr(self, 'audit_integration') and self.audit_integration:
-                                filled_data = {
-                                    'order_id': order.get('id', f"order_{int(time.time()*1000)}"),
-                                    'side': side,
-                                    'filled_quantity': final_qty,
-                                    'filled_price': current_price,
-                                    'commission': 0.0,  # 簡化處理
-                                    'slippage': 0.0,    # 簡化處理
-                                    'strategy_id': f"combo_{self.active_combo_mode}",
-                                    'idempotency_key': f"{symbol}_{side}_{int(time.time())}"
-                                }
-                                self.audit_integration.log_order_event("filled", filled_data, symbol)
+                                # 記錄稽核層訂單成交事件
+                                if audit_enabled:
+                                    self.audit_integration.log_order_event("filled", {
+                                        **audit_base,
+                                        'order_id': order.get('id', fallback_order_id),
+                                        'filled_quantity': final_qty,
+                                        'filled_price': current_price,
+                                        'commission': 0.0,  # 簡化處理
+                                        'slippage': 0.0     # 簡化處理
+                                    }, symbol)
                             
-                            # 記錄訂單創建，使用實例變數的組合模式
-                            from trading.trade_logger import log_order_created
-                            log_order_created(
-                                trading_pair=symbol,
-                                strategy_name=f"combo_{self.active_combo_mode}",
-                                combo_mode=self.active_combo_mode,
-                                order_id=order.get('id', f"order_{int(time.time()*1000)}"),
-                                side=side,
-                                quantity=final_qty,
-                                entry_price=current_price
-                            )
-                            logging.info(f"{symbol} 交易日誌已記錄")
-                        except Exception as e:
-                            logging.error(f"記錄交易日誌失敗: {e}")
-                            from trading.system_monitor import ErrorSeverity
-                            record_system_error("TRADE_LOGGING", str(e), ErrorSeverity.MEDIUM, "MultiSymbolTrader")
-                    else:
-                        # 訂單失敗，記錄拒絕事件
-                        if hasattr(self, 'audit_integration') and self.audit_integration:
-                            rejected_data = {
-                                'order_id': f"order_{int(time.time()*1000)}",
-                                'side': side,
-                                'rejection_reason': "下單失敗",
-                                'blocked_rules': ["order_failed"],
-                                'risk_level': "HIGH",
-                                'strategy_id': f"combo_{self.active_combo_mode}",
-                                'idempotency_key': f"{symbol}_{side}_{int(time.time())}"
-                            }
-                            self.audit_integration.log_order_event("rejected", rejected_data, symbol)
+                                # 記錄訂單創建，使用實例變數的組合模式
+                                from trading.trade_logger import log_order_created
+                                log_order_created(
+                                    trading_pair=symbol,
+                                    strategy_name=strategy_id,
+                                    combo_mode=self.active_combo_mode,
+                                    order_id=order.get('id', fallback_order_id),
+                                    side=side,
+                                    quantity=final_qty,
+                                    entry_price=current_price
+                                )
+                                logging.info(f"{symbol} 交易日誌已記錄")
+                            except Exception as e:
+                                logging.error(f"記錄交易日誌失敗: {e}")
+                                from trading.system_monitor import ErrorSeverity
+                                record_system_error("TRADE_LOGGING", str(e), ErrorSeverity.MEDIUM, "MultiSymbolTrader")
+                        else:
+                            # 訂單失敗，記錄拒絕事件
+                            if audit_enabled:
+                                self.audit_integration.log_order_event("rejected", {
+                                    **audit_base,
+                                    'rejection_reason': "下單失敗",
+                                    'blocked_rules': ["order_failed"],
+                                    'risk_level': "HIGH"
+                                }, symbol)
                     
-                    trader_status.hourly_trade_count += 1
-                    trader_status.daily_trade_count += 1
-                    trader_status.save()
-                    self.hourly_trade_count = trader_status.hourly_trade_count
-                    self.daily_trade_count = trader_status.daily_trade_count
+                        with self._status_lock:
+                            self.hourly_trade_count += 1
+                            self.daily_trade_count += 1
+                            self._pending_hourly_trades += 1
+                            self._pending_daily_trades += 1
+
+                except Exception as e:
+                    logging.error(f"{symbol} 在交易週期中發生錯誤：{e}")
+        finally:
+            # 本週期修改過的 last_trade_time 一次性寫回；連續止損次數只由 _flush_post_cycle_writes 寫回，
+            # 不以快照中可能已過期的值覆寫後台或其他程序的重置
+            TradingPair.objects.bulk_update(dirty_pairs, ['last_trade_time'])
+            self._flush_post_cycle_writes()
+            # 本週期累計的交易次數增量只寫回一次（無增量時不發出查詢）
+            self.flush_trader_status()
+            self.flush_volatility_status()
+
+    def _flush_post_cycle_writes(self):
+        """
+        寫回本週期排隊的 ORM 記帳：
+        DailyStats 損益按記錄合併後以 F 表達式原子累加；TradingPair 連續止損次數按記錄依序合併，
+        止損以 F 表達式累加、重置則寫入重置後的次數，不以快照中的舊值覆寫外部的修改。
+        寫回後重新讀取這些交易對的連續止損次數，同步到快照物件。
+        """
+        if not self._post_cycle_writes:
+            return
+        writes, self._post_cycle_writes = self._post_cycle_writes, []
+
+        pnl_by_stats = {}
+        # {交易對 pk: [交易對物件, 本週期是否重置過, 最後一次重置後的止損次數]}
+        stop_loss_by_pair = {}
+        for write in writes:
+            if write[0] == 'daily_pnl':
+                pnl_by_stats[write[1]] = pnl_by_stats.get(write[1], 0.0) + write[2]
+            else:
+                entry = stop_loss_by_pair.setdefault(write[1].pk, [write[1], False, 0])
+                if write[2]:
+                    entry[2] += 1
+                else:
+                    entry[1], entry[2] = True, 0
 
-            except Exception as e:
-                logging.error(f"{symbol} 在交易週期中發生錯誤：{e}")
+        with transaction.atomic():
+            now_dt = timezone.now()
+            for stats_pk, pnl in pnl_by_stats.items():
+                DailyStats.objects.filter(pk=stats_pk).update(pnl=F('pnl') + pnl, updated_at=now_dt)
+            for pair_pk, (_, was_reset, stop_losses) in stop_loss_by_pair.items():
+                TradingPair.objects.filter(pk=pair_pk).update(
+                    consecutive_stop_loss=stop_losses if was_reset else F('consecutive_stop_loss') + stop_losses,
+                    updated_at=now_dt,
+                )
+
+        if stop_loss_by_pair:
+            for pair_pk, count in TradingPair.objects.filter(pk__in=stop_loss_by_pair).values_list('pk', 'consecutive_stop_loss'):
+                stop_loss_by_pair[pair_pk][0].consecutive_stop_loss = count
 
     def initialize_start_balance(self):
         """
@@ -1129,89 +1849,107 @@ class MultiSymbolTrader:
         
         max_daily_loss_pct = self.get_config('MAX_DAILY_LOSS_PCT', type=float, default=0.25)
         
-        for trading_pair_obj in TradingPair.objects.all():
-            try:
-                daily_stats, created = DailyStats.objects.get_or_create(
-                    trading_pair=trading_pair_obj,
-                    date=timezone.localdate(),
-                    defaults={
-                        'start_balance': balance, 
-                        'pnl': 0.0, 
-                        'max_daily_loss_pct': max_daily_loss_pct
-                    }
-                )
-                if not created:
-                    daily_stats.start_balance = balance
-                    daily_stats.max_daily_loss_pct = max_daily_loss_pct  # 確保更新現有記錄
-                    daily_stats.save()
+        # 以單一 upsert 建立或更新所有交易對今日的 DailyStats（已存在時只更新起始資金與虧損上限）
+        today = timezone.localdate()
+        trading_pairs = list(TradingPair.objects.all())
+        rows = [
+            DailyStats(
+                trading_pair=trading_pair_obj,
+                date=today,
+                start_balance=balance,
+                pnl=0.0,
+                max_daily_loss_pct=max_daily_loss_pct
+            )
+            for trading_pair_obj in trading_pairs
+        ]
+        try:
+            DailyStats.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=['trading_pair', 'date'],
+                update_fields=['start_balance', 'max_daily_loss_pct', 'updated_at']
+            )
+            for trading_pair_obj in trading_pairs:
                 logging.info(f"{trading_pair_obj.symbol} 當日起始資金已更新為 {balance:.2f} USDT")
-            except Exception as e:
-                logging.error(f"更新 {trading_pair_obj.symbol} 的 DailyStats 失敗: {e}")
-                # 嘗試手動創建記錄
-                try:
-                    DailyStats.objects.create(
-                        trading_pair=trading_pair_obj,
-                        date=timezone.localdate(),
-                        start_balance=balance,
-                        pnl=0.0,
-                        max_daily_loss_pct=max_daily_loss_pct
-                    )
-                    logging.info(f"{trading_pair_obj.symbol} DailyStats 手動創建成功")
-                except Exception as e2:
-                    logging.error(f"手動創建 {trading_pair_obj.symbol} DailyStats 也失敗: {e2}")
+        except Exception as e:
+            logging.error(f"更新 DailyStats 起始資金失敗: {e}")
 
     def reset_daily_state(self):
         """
         每日重置交易狀態：止損次數歸零、盈虧歸零、恢復交易開關
         """
         logging.info("[RESET] 每日重置：恢復交易狀態")
+        # 重置時間只取一次，各筆寫入使用同一個時間點與日期
+        now_dt = timezone.now()
+        today = timezone.localdate(now_dt)
         with transaction.atomic():
-            # 重置所有 TradingPair 的連續止損次數
-            for trading_pair_obj in TradingPair.objects.all():
+            # 以單一 UPDATE 重置所有 TradingPair 的連續止損次數，快照中的物件同步歸零
+            TradingPair.objects.update(consecutive_stop_loss=0, updated_at=now_dt)
+            for trading_pair_obj in self._trading_pairs_snapshot:
                 trading_pair_obj.consecutive_stop_loss = 0
-                trading_pair_obj.save()
                 logging.info(f"{trading_pair_obj.symbol} 連續止損次數重置為 0")
             
             # 重置今日的 DailyStats 損益
-            self.reset_daily_stats()
-
-            # 恢復交易狀態
-            trader_status = TraderStatus.objects.get(pk=1)
-            trader_status.is_trading_enabled = True
-            trader_status.last_daily_reset_date = timezone.localdate()
-            trader_status.daily_trade_count = 0
-            trader_status.hourly_trade_count = 0
-            trader_status.last_hourly_reset = timezone.now()
-            trader_status.save()
-            logging.info("交易開關已恢復為 True，每日重置日期已更新。")
-            self.daily_trade_count = 0
-            self.hourly_trade_count = 0
-            self.last_hourly_reset = trader_status.last_hourly_reset
-
-
-    def reset_daily_stats(self):
+            self.reset_daily_stats(today)
+
+            # 恢復交易狀態（持鎖寫入並捨棄重置前尚未寫回的增量，避免背景執行緒再累加上去）
+            with self._status_lock:
+                trader_status = TraderStatus.objects.get(pk=1)
+                trader_status.is_trading_enabled = True
+                trader_status.last_daily_reset_date = today
+                trader_status.daily_trade_count = 0
+                trader_status.hourly_trade_count = 0
+                trader_status.last_hourly_reset = now_dt
+                trader_status.save(update_fields=[
+                    'is_trading_enabled', 'last_daily_reset_date', 'daily_trade_count',
+                    'hourly_trade_count', 'last_hourly_reset', 'updated_at',
+                ])
+                logging.info("交易開關已恢復為 True，每日重置日期已更新。")
+                self.daily_trade_count = 0
+                self.hourly_trade_count = 0
+                self.last_hourly_reset = trader_status.last_hourly_reset
+                self._pending_hourly_trades = 0
+                self._pending_daily_trades = 0
+
+
+    def reset_daily_stats(self, today=None):
         """
         將所有幣種今日的 pnl 歸零，避免前一天統計影響今天的交易
+        today 未提供時取當前日期
         """
-        today = timezone.localdate()
+        if today is None:
+            today = timezone.localdate()
         max_daily_loss_pct = self.get_config('MAX_DAILY_LOSS_PCT', type=float, default=0.25)
-        for trading_pair_obj in TradingPair.objects.all():
-            daily_stats, created = DailyStats.objects.get_or_create(
-                trading_pair=trading_pair_obj,
-                date=today,
-                defaults={'pnl': 0.0, 'start_balance': self.get_available_usdt_balance(), 'max_daily_loss_pct': max_daily_loss_pct}
-            )
-            if not created:
-                daily_stats.pnl = 0.0
-                daily_stats.save()
+        if not self._trading_pairs_snapshot:
+            return
+        # 以單一 upsert 清空今日損益；尚無記錄的交易對以當前餘額建立
+        start_balance = self.get_available_usdt_balance()
+        DailyStats.objects.bulk_create(
+            [
+                DailyStats(
+                    trading_pair=trading_pair_obj,
+                    date=today,
+                    pnl=0.0,
+                    start_balance=start_balance,
+                    max_daily_loss_pct=max_daily_loss_pct
+                )
+                for trading_pair_obj in self._trading_pairs_snapshot
+            ],
+            update_conflicts=True,
+            unique_fields=['trading_pair', 'date'],
+            update_fields=['pnl', 'updated_at']
+        )
+        for trading_pair_obj in self._trading_pairs_snapshot:
             logging.info(f"{trading_pair_obj.symbol} 今日損益已清空")
 
-    def should_trigger_circuit_breaker(self, symbol: str) -> bool:
+    def should_trigger_circuit_breaker(self, symbol: str, daily_stats_obj=None) -> bool:
         """
         判斷該幣種是否已達當日虧損上限，若是則觸發熔斷停止交易
+        可傳入已載入的 DailyStats，否則從數據庫讀取
         """
-        # 從數據庫獲取最新 DailyStats
-        daily_stats_obj = DailyStats.objects.filter(trading_pair__symbol=symbol, date=timezone.localdate()).first()
+        if daily_stats_obj is None:
+            # 從數據庫獲取最新 DailyStats
+            daily_stats_obj = DailyStats.objects.filter(trading_pair__symbol=symbol, date=timezone.localdate()).first()
         if not daily_stats_obj:
             logging.warning(f"未找到 {symbol} 今日的 DailyStats，跳過熔斷檢查。")
             return False
@@ -1223,19 +1961,25 @@ class MultiSymbolTrader:
         max_loss = start_balance * max_daily_loss_pct
         return pnl <= -max_loss
 
-    def check_exit_conditions(self, symbol: str):
+    def check_exit_conditions(self, symbol: str, trading_pair_obj=None, daily_stats_obj=None,
+                              df: pd.DataFrame = None, df_interval: str = None, position_obj=None):
         """
         檢查是否觸發停利或止損，並執行平倉與記錄
+        可傳入已載入的 TradingPair / DailyStats / 活躍 Position，省去重複查詢；
+        傳入已計算指標的 df 且其週期 df_interval 與平倉使用的週期相同時，不再重新抓取 K 線
+        回傳是否觸發平倉條件
         """
         price = self.get_current_price(symbol)
         if price is None:
             return
 
-        try:
-            position_obj = Position.objects.get(trading_pair__symbol=symbol, active=True)
-        except Position.DoesNotExist:
-            # 沒有活躍持倉，無需檢查平倉條件
-            return
+        # 傳入的持倉可能來自週期緩存，觸發平倉時於平倉事務內鎖定並確認仍為活躍
+        if position_obj is None:
+            try:
+                position_obj = Position.objects.get(trading_pair__symbol=symbol, active=True)
+            except Position.DoesNotExist:
+                # 沒有活躍持倉，無需檢查平倉條件
+                return
 
         qty = position_obj.quantity
         entry = position_obj.entry_price
@@ -1244,118 +1988,73 @@ class MultiSymbolTrader:
         # 計算當前浮動盈虧金額
         pnl = (price - entry) * qty if side == SIDE_BUY else (entry - price) * qty
 
-        # 獲取K線數據用於計算ATR (如果需要)
-        trading_pair_obj = TradingPair.objects.get(symbol=symbol) # 從數據庫獲取 TradingPair
-        # 從數據庫獲取 SYMBOL_INTERVALS
-        symbol_intervals_config = self.get_config('SYMBOL_INTERVALS', type=dict, default={})
-        interval = symbol_intervals_config.get(symbol, "1m") # 使用從數據庫讀取的配置
-        df = self.fetch_historical_klines(symbol, interval=interval)
-        if not df.empty:
-            df = self.precompute_indicators(df)
-
-        # 從數據庫獲取止盈止損模式和參數
-        exit_mode = self.get_config('EXIT_MODE', default="PERCENTAGE")
-        price_take_profit_percent = self.get_config('PRICE_TAKE_PROFIT_PERCENT', type=float, default=0.5)
-        price_stop_loss_percent = self.get_config('PRICE_STOP_LOSS_PERCENT', type=float, default=0.25)
-        amount_take_profit_usdt = self.get_config('AMOUNT_TAKE_PROFIT_USDT', type=float, default=10.0)
-        amount_stop_loss_usdt = self.get_config('AMOUNT_STOP_LOSS_USDT', type=float, default=5.0)
-        atr_take_profit_multiplier = self.get_config('ATR_TAKE_PROFIT_MULTIPLIER', type=float, default=1.5)
-        atr_stop_loss_multiplier = self.get_config('ATR_STOP_LOSS_MULTIPLIER', type=float, default=1.0)
-        hybrid_min_take_profit_usdt = self.get_config('HYBRID_MIN_TAKE_PROFIT_USDT', type=float, default=5.0)
-        hybrid_max_take_profit_usdt = self.get_config('HYBRID_MAX_TAKE_PROFIT_USDT', type=float, default=20.0)
-        hybrid_min_stop_loss_usdt = self.get_config('HYBRID_MIN_STOP_LOSS_USDT', type=float, default=3.0)
-        hybrid_max_stop_loss_usdt = self.get_config('HYBRID_MAX_STOP_LOSS_USDT', type=float, default=10.0)
-
-        exit_triggered = False
-        exit_reason = ""
-
-        if exit_mode == "PERCENTAGE":
-            if side == SIDE_BUY:
-                take_profit_price = entry * (1 + price_take_profit_percent / 100)
-                stop_loss_price = entry * (1 - price_stop_loss_percent / 100)
-                
-                if price >= take_profit_price:
-                    exit_triggered = True
-                    exit_reason = "take_profit_price_percent"
-                elif price <= stop_loss_price:
-                    exit_triggered = True
-                    exit_reason = "stop_loss_price_percent"
-            else:  # SIDE_SELL
-                take_profit_price = entry * (1 - price_take_profit_percent / 100)
-                stop_loss_price = entry * (1 + price_stop_loss_percent / 100)
-                
-                if price <= take_profit_price:
-                    exit_triggered = True
-                    exit_reason = "take_profit_price_percent"
-                elif price >= stop_loss_price:
-                    exit_triggered = True
-                    exit_reason = "stop_loss_price_percent"
-
-        elif exit_mode == "AMOUNT":
-            if pnl >= amount_take_profit_usdt:
-                exit_triggered = True
-                exit_reason = "take_profit_amount"
-            elif pnl <= -amount_stop_loss_usdt:
-                exit_triggered = True
-                exit_reason = "stop_loss_amount"
-
-        elif exit_mode == "ATR":
-            if not df.empty and 'atr' in df.columns and df['atr'].iloc[-1] is not None:
-                current_atr = df['atr'].iloc[-1]
-                if side == SIDE_BUY:
-                    take_profit_price = entry + (current_atr * atr_take_profit_multiplier)
-                    stop_loss_price = entry - (current_atr * atr_stop_loss_multiplier)
-                    
-                    if price >= take_profit_price:
-                        exit_triggered = True
-                        exit_reason = "take_profit_atr"
-                    elif price <= stop_loss_price:
-                        exit_triggered = True
-                        exit_reason = "stop_loss_atr"
-                else:  # SIDE_SELL
-                    take_profit_price = entry - (current_atr * atr_take_profit_multiplier)
-                    stop_loss_price = entry + (current_atr * atr_stop_loss_multiplier)
-                    
-                    if price <= take_profit_price:
-                        exit_triggered = True
-                        exit_reason = "take_profit_atr"
-                    elif price >= stop_loss_price:
-                        exit_triggered = True
-                        exit_reason = "stop_loss_atr"
+        if trading_pair_obj is None:
+            trading_pair_obj = TradingPair.objects.get(symbol=symbol) # 從數據庫獲取 TradingPair
+        # 配置快照只讀取一次，之後皆為屬性存取
+        cfg = self.cfg
+        # 止盈止損模式和參數（來自配置快照）
+        exit_mode = cfg.exit_mode
+
+        # 只有 ATR / HYBRID 模式需要 K 線與 ATR；其他模式未傳入可用的 df 時不抓取 K 線、不計算指標
+        interval = cfg.symbol_intervals.get(symbol, "1m") # 使用從數據庫讀取的配置
+        if df_interval != interval:
+            df = None
+        if df is None and exit_mode in ("ATR", "HYBRID"):
+            df = self.fetch_historical_klines(symbol, interval=interval)
+            if not df.empty:
+                df = self._cached_indicators(symbol, interval, df)
+        # 最新 ATR 只讀取一次，None 表示無 ATR 數據
+        atr_last = self._last_atr(df) if df is not None and len(df) and 'atr' in df.columns else None
+
+        price_take_profit_percent = cfg.price_take_profit_percent
+        price_stop_loss_percent = cfg.price_stop_loss_percent
+        amount_take_profit_usdt = cfg.amount_take_profit_usdt
+        amount_stop_loss_usdt = cfg.amount_stop_loss_usdt
+        atr_take_profit_multiplier = cfg.atr_take_profit_multiplier
+        atr_stop_loss_multiplier = cfg.atr_stop_loss_multiplier
+        hybrid_min_take_profit_usdt = cfg.hybrid_min_take_profit_usdt
+        hybrid_max_take_profit_usdt = cfg.hybrid_max_take_profit_usdt
+        hybrid_min_stop_loss_usdt = cfg.hybrid_min_stop_loss_usdt
+        hybrid_max_stop_loss_usdt = cfg.hybrid_max_stop_loss_usdt
+
+        # ATR / HYBRID 模式需要可用的 ATR 數據
+        current_atr = np.nan
+        atr_available = True
+        if exit_mode in ("ATR", "HYBRID"):
+            if atr_last is not None:
+                current_atr = float(atr_last)
             else:
-                logging.warning(f"{symbol}: ATR 數據不可用，無法執行 ATR 止盈止損模式。")
+                atr_available = False
+                logging.warning(f"{symbol}: ATR 數據不可用，無法執行 {exit_mode} 止盈止損模式。")
 
-        elif exit_mode == "HYBRID":
-            if not df.empty and 'atr' in df.columns and df['atr'].iloc[-1] is not None:
-                current_atr = df['atr'].iloc[-1]
-                
-                # 計算基於 ATR 的止盈止損金額
-                atr_tp_amount = current_atr * qty * atr_take_profit_multiplier
-                atr_sl_amount = current_atr * qty * atr_stop_loss_multiplier
-                
-                # 應用混合模式的上下限
-                take_profit_amount = max(
-                    min(atr_tp_amount, hybrid_max_take_profit_usdt),
-                    hybrid_min_take_profit_usdt
-                )
-                stop_loss_amount = min(
-                    max(atr_sl_amount, hybrid_min_stop_loss_usdt),
-                    hybrid_max_stop_loss_usdt
-                ) # 注意：止損金額應為負值，這裡的 min/max 邏輯可能需要調整以確保止損金額是期望的負值範圍
-                # 為了確保 stop_loss_amount 是一個正值用於比較，我們在比較時將 pnl 轉為負數
-                # 或是確保 stop_loss_amount 已經是絕對值。
-                
-                if pnl >= take_profit_amount:
-                    exit_triggered = True
-                    exit_reason = "take_profit_hybrid"
-                elif pnl <= -stop_loss_amount: # pnl 是負數，與 -stop_loss_amount 比較
-                    exit_triggered = True
-                    exit_reason = "stop_loss_hybrid"
-            else:
-                logging.warning(f"{symbol}: ATR 數據不可用，無法執行 HYBRID 止盈止損模式。")
+        exit_reason = ""
+        mode_code = EXIT_MODE_CODES.get(exit_mode)
+        if mode_code is not None and atr_available:
+            exit_params = np.array([
+                price_take_profit_percent, price_stop_loss_percent,
+                amount_take_profit_usdt, amount_stop_loss_usdt,
+                atr_take_profit_multiplier, atr_stop_loss_multiplier,
+                hybrid_min_take_profit_usdt, hybrid_max_take_profit_usdt,
+                hybrid_min_stop_loss_usdt, hybrid_max_stop_loss_usdt,
+            ], dtype=np.float64)
+            reason_code = decide_exit(
+                side == SIDE_BUY, float(price), float(entry), float(qty), float(pnl),
+                current_atr, mode_code, exit_params
+            )
+            exit_reason = EXIT_REASONS[reason_code]
+        exit_triggered = exit_reason != ""
 
         if exit_triggered:
             with transaction.atomic(): # 使用事務確保數據一致性
+                # 在平倉事務內鎖定持倉列：已被其他程序鎖定時直接跳過（skip_locked）而不等待；
+                # 持倉已於週期開始載入後被關閉時同樣不下單。SQLite 不支援列鎖，此時僅確認持倉仍為活躍
+                locked_position = Position.objects.select_for_update(skip_locked=True).filter(
+                    pk=position_obj.pk, active=True
+                ).values_list('pk', flat=True)
+                if not locked_position:
+                    logging.info(f"{symbol}: 持倉已不再活躍或正由其他程序處理，跳過平倉。")
+                    return False
+
                 # 記錄平倉前的倉位信息
                 exit_order = self.close_position(symbol, qty)
                 
@@ -1381,50 +2080,44 @@ class MultiSymbolTrader:
                         from trading.system_monitor import ErrorSeverity
                         record_system_error("EXIT_TRADE_LOGGING", str(e), ErrorSeverity.MEDIUM, "MultiSymbolTrader")
                 
-                # 更新 DailyStats 的 pnl
-                daily_stats_obj = DailyStats.objects.get(trading_pair=trading_pair_obj, date=timezone.localdate())
+                # 更新 DailyStats 的 pnl（記憶體物件立即累加供本週期熔斷檢查，數據庫於週期結束時寫回）
+                if daily_stats_obj is None:
+                    daily_stats_obj = DailyStats.objects.get(trading_pair=trading_pair_obj, date=timezone.localdate())
                 daily_stats_obj.pnl += pnl
-                daily_stats_obj.save()
+                self._post_cycle_writes.append(('daily_pnl', daily_stats_obj.pk, pnl))
 
-                # 更新 TradingPair 的連續止損計數
-                if "stop_loss" in exit_reason:
+                # 更新 TradingPair 的連續止損計數（週期結束時寫回）
+                is_stop_loss = "stop_loss" in exit_reason
+                if is_stop_loss:
                     trading_pair_obj.consecutive_stop_loss += 1
                     logging.warning(f"{symbol} {exit_reason} 止損平倉 → {pnl:.2f} USDT")
                 else:
                     trading_pair_obj.consecutive_stop_loss = 0
                     logging.info(f"{symbol} {exit_reason} 止盈平倉 +{pnl:.2f} USDT")
-                trading_pair_obj.save()
+                self._post_cycle_writes.append(('stop_loss_count', trading_pair_obj, is_stop_loss))
 
                 # 記錄交易
-                enable_trade_log = self.get_config('ENABLE_TRADE_LOG', type=bool, default=False)
-                if enable_trade_log:
+                if cfg.enable_trade_log:
                     self.log_trade(symbol, side, entry, price, qty, pnl, exit_reason)
 
                 # 記錄 ATR 相關信息（用於監控和調試）
-                if not df.empty and 'atr' in df.columns and df['atr'].iloc[-1] is not None:
-                    current_atr = df['atr'].iloc[-1]
+                if atr_last is not None:
+                    current_atr = atr_last
                     atr_percent = (current_atr / price) * 100
                     logging.debug(f"{symbol} 當前 ATR: {current_atr:.6f} ({atr_percent:.2f}%) Kishan")
 
+        return exit_triggered
+
     def log_trade(self, symbol, side, entry_price, exit_price, qty, pnl, reason):
         """
-        寫入一筆交易紀錄到 logs/trade_log.csv
+        將一筆交易紀錄加入佇列，由背景執行緒批次寫入 logs/trade_log.csv
         """
         # ENABLE_TRADE_LOG 現在從數據庫獲取，並在調用處檢查，這裡不需要再檢查一次
-
-        import os, csv
-        filepath = os.path.join("logs", "trade_log.csv")
-        write_header = not os.path.exists(filepath)
-
-        with open(filepath, mode='a', newline='') as file:
-            writer = csv.writer(file)
-            if write_header:
-                writer.writerow(['time', 'symbol', 'side', 'entry_price', 'exit_price', 'quantity', 'pnl', 'reason'])
-
-            writer.writerow([
-                datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                symbol, side, entry_price, exit_price, qty, pnl, reason
-            ])
+        self._trade_log_queue.append([
+            time.strftime(_TRADE_LOG_TIME_FORMAT),
+            symbol, side, entry_price, exit_price, qty, pnl, reason
+        ])
+        self._trade_log_wake.set()
 
     def _calculate_average_historical_atr(self, symbol: str, interval: str, limit: int = 200) -> float | None:
         """
@@ -1435,7 +2128,14 @@ class MultiSymbolTrader:
             limit (int): 獲取歷史 K 線的數量 (預設 200 根)
         回傳：
             float | None: 計算出的平均 ATR 值，如果無法獲取數據或計算失敗則回傳 None。
+        已有相符的遞推狀態時只以新 K 線更新；完整計算後同時保存遞推狀態。
         """
+        state = self._atr_states.get(symbol)
+        if state is not None:
+            average_atr = self._advance_average_historical_atr(symbol, interval, limit, state)
+            if average_atr is not None:
+                return average_atr
+
         try:
             # 獲取指定數量歷史 K 線數據
             df = self.fetch_historical_klines(symbol, interval=interval, limit=limit)
@@ -1444,36 +2144,207 @@ class MultiSymbolTrader:
                 logging.warning(f"{symbol}: 無法獲取歷史 K 線數據 (limit={limit})，無法計算平均 ATR。")
                 return None
 
-            # 對歷史數據計算技術指標，包括 ATR
-            df = self.precompute_indicators(df)
-
-            # 檢查計算結果中 ATR 欄位是否存在且有效
-            if 'atr' not in df.columns or df['atr'].empty or df['atr'].isna().all():
+            # 與 precompute_indicators 相同，不足 50 根時不計算指標
+            if len(df) < 50:
                  logging.warning(f"{symbol}: 歷史數據中無法計算 ATR 或 ATR 數據無效，無法計算平均 ATR。")
                  return None
 
-            # 計算 ATR 欄位的平均值
-            average_atr = df['atr'].mean()
+            # 最後一根為正在形成的 K 線，平均 ATR 與遞推狀態只以已收盤的 K 線計算，
+            # 避免把未收盤 K 線的暫時高低收價寫入保存的狀態
+            high = df['high'].to_numpy(dtype=np.float64)[:-1]
+            low = df['low'].to_numpy(dtype=np.float64)[:-1]
+            close = df['close'].to_numpy(dtype=np.float64)[:-1]
+
+            if NUMBA_AVAILABLE:
+                # 單次走訪直接累加平均 ATR，不建立 ATR 陣列；核心釋放 GIL，各幣種可在執行緒池中並行計算
+                last_atr, average_atr = atr_stats(high, low, close, 14)
+            else:
+                # 此處只需要 ATR，直接以 talib 計算，不必連同 EMA / RSI / MACD 一起計算
+                atr = talib.ATR(high, low, close, timeperiod=14)
+                last_atr = float(atr[-1])
+                # 忽略暖機期的 NaN，與 Series.mean() 相同；全為 NaN 時結果為 NaN
+                average_atr = float(np.nanmean(atr)) if not np.isnan(atr).all() else float('nan')
 
             # 確保計算出的平均 ATR 是有效的數字
-            if pd.isna(average_atr) or average_atr is None:
+            if math.isnan(average_atr):
+                 logging.warning(f"{symbol}: 歷史數據中無法計算 ATR 或 ATR 數據無效，無法計算平均 ATR。")
                  return None
 
-            # 回傳浮點數格式的平均 ATR
-            return float(average_atr)
+            last_ts_ms = df.attrs.get('last_ts_ms')
+            interval_ms = _interval_to_ms(interval)
+            if last_ts_ms is not None and interval_ms is not None:
+                self._atr_states[symbol] = {
+                    'interval': interval,
+                    'limit': limit,
+                    'closed_only': True,
+                    # 最後一根已收盤 K 線的開盤時間
+                    'last_timestamp': last_ts_ms - interval_ms,
+                    'atr': float(last_atr),
+                    'running_mean': average_atr,
+                    'count': len(close) - 14,
+                    'prev_close': float(close[-1]),
+                }
+            return average_atr
 
         except Exception as e:
             # 捕獲並記錄計算歷史平均 ATR 過程中的錯誤
             logging.error(f"{symbol}: 計算歷史平均 ATR 時發生錯誤: {e}")
             return None
 
-    def check_volatility_risk_adjustment(self, symbol: str, df: pd.DataFrame) -> bool:
+    def _advance_average_historical_atr(self, symbol: str, interval: str, limit: int, state: dict) -> float | None:
+        """
+        以上次保存的遞推狀態，只抓取之後新收盤的 K 線，以 Wilder 平滑遞推 ATR 並更新平均值。
+        狀態只記錄已收盤的 K 線，正在形成的最後一根不計入。
+        狀態與目前的週期/數量不符、由舊版本保存（含未收盤 K 線）、距上次更新已超過 limit 根 K 線
+        或資料有缺口時回傳 None，改為完整計算。
+        """
+        interval_ms = _interval_to_ms(interval)
+        if (interval_ms is None or state.get('interval') != interval or state.get('limit') != limit
+                or not state.get('closed_only')):
+            return None
+        try:
+            last_ts = int(state['last_timestamp'])
+            # 狀態之後的 K 線數量（含正在形成的一根）
+            new_bars = int((time.time() * 1000 - last_ts) // interval_ms)
+            if new_bars <= 1:
+                return float(state['running_mean'])
+            if new_bars >= limit:
+                return None
+
+            # 多抓一根與狀態重疊的 K 線，依最後一根已收盤 K 線的時間戳推算狀態之後新收盤的數量
+            df = self.fetch_historical_klines(symbol, interval=interval, limit=new_bars + 1)
+            if df.empty:
+                return None
+            closed_last_ts = df.attrs['last_ts_ms'] - interval_ms
+            fresh = int((closed_last_ts - last_ts) // interval_ms)
+            if fresh <= 0:
+                return float(state['running_mean'])
+            if fresh > len(df) - 1:
+                return None
+
+            # 直接切取底層 numpy 陣列中已收盤的尾段，不建立 DataFrame 切片
+            atr_value, average_atr, count, prev_close = atr_advance(
+                float(state['atr']), float(state['running_mean']), int(state['count']), float(state['prev_close']),
+                df['high'].to_numpy(dtype=np.float64)[-fresh - 1:-1],
+                df['low'].to_numpy(dtype=np.float64)[-fresh - 1:-1],
+                df['close'].to_numpy(dtype=np.float64)[-fresh - 1:-1],
+                14, max(limit - 14, 1)
+            )
+        except Exception as e:
+            logging.warning(f"{symbol}: 以遞推狀態更新平均 ATR 失敗，改為完整計算: {e}")
+            return None
+
+        if math.isnan(average_atr):
+            return None
+        self._atr_states[symbol] = {
+            'interval': interval,
+            'limit': limit,
+            'closed_only': True,
+            'last_timestamp': closed_last_ts,
+            'atr': float(atr_value),
+            'running_mean': float(average_atr),
+            'count': int(count),
+            'prev_close': float(prev_close),
+        }
+        return float(average_atr)
+
+    def _preload_volatility_statuses(self):
+        """以單次查詢載入各幣種已存在的 VolatilityPauseStatus，並同步到內存中的暫停狀態"""
+        try:
+            statuses = VolatilityPauseStatus.objects.select_related('trading_pair').filter(
+                trading_pair__symbol__in=self.symbols
+            )
+            for volatility_status in statuses:
+                symbol = volatility_status.trading_pair.symbol
+                self._volatility_status_objs[symbol] = volatility_status
+                self.volatility_pause_status[symbol] = {
+                    'is_paused': volatility_status.is_paused,
+                    'pause_start_time': volatility_status.pause_start_time,
+                    'pause_reason': volatility_status.pause_reason,
+                    'current_atr_ratio': volatility_status.current_atr_ratio,
+                }
+        except Exception as e:
+            logging.error(f"預載波動率暫停狀態失敗: {e}")
+
+    def _save_volatility_status(self, symbol: str, volatility_status):
+        """
+        暫停/恢復狀態切換時同步內存中的暫停狀態，數據庫寫入延後至週期結束
+        由 flush_volatility_status 以 bulk_update 一次寫回。
+        """
+        self._volatility_transitions.add(symbol)
+        self.volatility_pause_status[symbol] = {
+            'is_paused': volatility_status.is_paused,
+            'pause_start_time': volatility_status.pause_start_time,
+            'pause_reason': volatility_status.pause_reason,
+            'current_atr_ratio': volatility_status.current_atr_ratio,
+        }
+
+    def flush_volatility_status(self, force: bool = False):
+        """
+        以單次 bulk_update 寫回有變動的波動率暫停狀態。
+        暫停/恢復切換於每個週期結束時必定寫入；僅 ATR 比率變動的幣種
+        未達 volatility_status_flush_interval 時不寫入，force=True 時立即寫入。
+        """
+        now = time.monotonic()
+        ratio_due = bool(self._volatility_status_dirty) and (
+            force or now - self._volatility_status_flushed_at >= self.volatility_status_flush_interval
+        )
+        if not self._volatility_transitions and not ratio_due:
+            return
+        symbols = self._volatility_transitions | self._volatility_status_dirty if ratio_due else set(self._volatility_transitions)
+        updated_at = timezone.now()
+        statuses = []
+        for symbol in symbols:
+            volatility_status = self._volatility_status_objs.get(symbol)
+            if volatility_status is None:
+                continue
+            volatility_status.updated_at = updated_at
+            statuses.append(volatility_status)
+            # 內存中的暫停狀態與數據庫同步更新 ATR 比率
+            self.volatility_pause_status.setdefault(symbol, {})['current_atr_ratio'] = volatility_status.current_atr_ratio
+        try:
+            VolatilityPauseStatus.objects.bulk_update(statuses, [
+                'is_paused', 'pause_start_time', 'pause_reason', 'current_atr_ratio', 'updated_at'
+            ])
+            self._volatility_transitions.clear()
+            self._volatility_status_dirty.difference_update(symbols)
+            if ratio_due:
+                self._volatility_status_flushed_at = now
+        except Exception as e:
+            logging.error(f"寫回波動率暫停狀態失敗: {e}")
+
+    def _compute_volatility_snapshot(self, symbol: str, df: pd.DataFrame) -> VolatilitySnapshot:
+        """
+        計算歷史平均 ATR、當前 ATR 與兩者比率，供 check_volatility_risk_adjustment
+        與 adjust_position_size_by_volatility 在同一週期內共用。
+        """
+        # 獲取歷史平均ATR
+        avg_atr = self.average_atrs.get(symbol)
+        if avg_atr is None or avg_atr < 1e-9:
+            return VolatilitySnapshot(warning="無法獲取有效的歷史平均ATR，跳過波動率檢查")
+            
+        # 獲取當前ATR
+        if 'atr' not in df.columns or len(df) == 0:
+            return VolatilitySnapshot(avg_atr=avg_atr, warning="無法獲取當前ATR數據，跳過波動率檢查")
+            
+        current_atr = self._last_atr(df)
+        if math.isnan(current_atr):
+            return VolatilitySnapshot(avg_atr=avg_atr, warning="當前ATR數據無效，跳過波動率檢查")
+            
+        # 計算ATR比率
+        return VolatilitySnapshot(
+            avg_atr=avg_atr, current_atr=current_atr, atr_ratio=current_atr / avg_atr, valid=True
+        )
+
+    def check_volatility_risk_adjustment(self, symbol: str, df: pd.DataFrame,
+                                         snapshot: VolatilitySnapshot | None = None) -> bool:
         """
         檢查波動率風險並進行調整
         
         參數：
             symbol (str): 交易對符號
             df (pd.DataFrame): 包含ATR數據的DataFrame
+            snapshot (VolatilitySnapshot | None): 本週期已計算的波動率數值，未提供時從 df 計算
             
         回傳：
             bool: True表示可以正常交易，False表示因波動率異常而暫停交易
@@ -1481,43 +2352,33 @@ class MultiSymbolTrader:
         if not self.enable_volatility_risk_adjustment:
             return True
             
-        # 獲取歷史平均ATR
-        avg_atr = self.average_atrs.get(symbol)
-        if avg_atr is None or avg_atr < 1e-9:
-            logging.warning(f"{symbol}: 無法獲取有效的歷史平均ATR，跳過波動率檢查")
+        if snapshot is None:
+            snapshot = self._compute_volatility_snapshot(symbol, df)
+        if not snapshot.valid:
+            logging.warning(f"{symbol}: {snapshot.warning}")
             return True
-            
-        # 獲取當前ATR
-        if 'atr' not in df.columns or df['atr'].empty:
-            logging.warning(f"{symbol}: 無法獲取當前ATR數據，跳過波動率檢查")
-            return True
-            
-        current_atr = df['atr'].iloc[-1]
-        if current_atr is None or pd.isna(current_atr):
-            logging.warning(f"{symbol}: 當前ATR數據無效，跳過波動率檢查")
-            return True
-            
-        # 計算ATR比率
-        atr_ratio = current_atr / avg_atr
+        atr_ratio = snapshot.atr_ratio
         
-        # 獲取或創建波動率暫停狀態記錄
-        try:
-            trading_pair_obj = TradingPair.objects.get(symbol=symbol)
-            volatility_status, created = VolatilityPauseStatus.objects.get_or_create(
-                trading_pair=trading_pair_obj,
-                defaults={
-                    'is_paused': False,
-                    'current_atr_ratio': atr_ratio
-                }
-            )
-            
-            # 更新當前ATR比率
-            volatility_status.current_atr_ratio = atr_ratio
-            volatility_status.save()
-            
-        except Exception as e:
-            logging.error(f"{symbol}: 無法獲取波動率暫停狀態: {e}")
-            return True
+        # 獲取波動率暫停狀態記錄（啟動時已預載，新幣種首次檢查時才建立）
+        volatility_status = self._volatility_status_objs.get(symbol)
+        if volatility_status is None:
+            try:
+                trading_pair_obj = TradingPair.objects.get(symbol=symbol)
+                volatility_status, created = VolatilityPauseStatus.objects.get_or_create(
+                    trading_pair=trading_pair_obj,
+                    defaults={
+                        'is_paused': False,
+                        'current_atr_ratio': atr_ratio
+                    }
+                )
+            except Exception as e:
+                logging.error(f"{symbol}: 無法獲取波動率暫停狀態: {e}")
+                return True
+            self._volatility_status_objs[symbol] = volatility_status
+        
+        # 更新當前ATR比率（只更新內存，稍後批次寫回）
+        volatility_status.current_atr_ratio = atr_ratio
+        self._volatility_status_dirty.add(symbol)
         
         # 檢查是否應該暫停交易
         if atr_ratio >= self.volatility_pause_threshold:
@@ -1526,25 +2387,27 @@ class MultiSymbolTrader:
                 volatility_status.is_paused = True
                 volatility_status.pause_start_time = timezone.now()
                 volatility_status.pause_reason = f"波動率異常放大 (ATR比率: {atr_ratio:.2f})"
-                volatility_status.save()
+                self._save_volatility_status(symbol, volatility_status)
                 logging.warning(f"{symbol}: 波動率異常放大，ATR比率為 {atr_ratio:.2f}，暫停交易")
             return False
             
         # 檢查是否可以恢復交易
         elif atr_ratio <= self.volatility_recovery_threshold:
             if volatility_status.is_paused:
-                # 檢查是否達到最小暫停時間
+                # 檢查是否達到最小暫停時間（當前時間只取一次；缺少暫停開始時間時無法計算冷卻期，直接恢復）
                 pause_start = volatility_status.pause_start_time
-                if pause_start and (timezone.now() - pause_start).total_seconds() >= self.volatility_pause_duration_minutes * 60:
+                min_pause_seconds = self.volatility_pause_duration_minutes * 60
+                elapsed_seconds = (timezone.now() - pause_start).total_seconds() if pause_start else min_pause_seconds
+                if elapsed_seconds >= min_pause_seconds:
                     # 恢復交易
                     volatility_status.is_paused = False
                     volatility_status.pause_start_time = None
                     volatility_status.pause_reason = None
-                    volatility_status.save()
+                    self._save_volatility_status(symbol, volatility_status)
                     logging.info(f"{symbol}: 波動率已恢復正常，ATR比率為 {atr_ratio:.2f}，恢復交易")
                 else:
                     # 還在最小暫停時間內
-                    remaining_time = self.volatility_pause_duration_minutes * 60 - (timezone.now() - pause_start).total_seconds()
+                    remaining_time = min_pause_seconds - elapsed_seconds
                     logging.info(f"{symbol}: 波動率已降低但仍在冷卻期內，剩餘 {remaining_time/60:.1f} 分鐘")
                     return False
             return True
@@ -1559,7 +2422,8 @@ class MultiSymbolTrader:
             
         return True
 
-    def adjust_position_size_by_volatility(self, symbol: str, base_quantity: float, df: pd.DataFrame) -> float:
+    def adjust_position_size_by_volatility(self, symbol: str, base_quantity: float, df: pd.DataFrame,
+                                           snapshot: VolatilitySnapshot | None = None) -> float:
         """
         根據波動率調整倉位大小
         
@@ -1567,6 +2431,7 @@ class MultiSymbolTrader:
             symbol (str): 交易對符號
             base_quantity (float): 基礎倉位大小
             df (pd.DataFrame): 包含ATR數據的DataFrame
+            snapshot (VolatilitySnapshot | None): 本週期已計算的波動率數值，未提供時從 df 計算
             
         回傳：
             float: 調整後的倉位大小
@@ -1574,44 +2439,34 @@ class MultiSymbolTrader:
         if not self.enable_volatility_risk_adjustment:
             return base_quantity
             
-        # 獲取歷史平均ATR
-        avg_atr = self.average_atrs.get(symbol)
-        if avg_atr is None or avg_atr < 1e-9:
-            return base_quantity
-            
-        # 獲取當前ATR
-        if 'atr' not in df.columns or df['atr'].empty:
-            return base_quantity
-            
-        current_atr = df['atr'].iloc[-1]
-        if current_atr is None or pd.isna(current_atr):
+        if snapshot is None:
+            snapshot = self._compute_volatility_snapshot(symbol, df)
+        if not snapshot.valid:
             return base_quantity
             
-        # 計算ATR比率
-        atr_ratio = current_atr / avg_atr
+        # 計算ATR比率與調整係數
+        atr_ratio, adjustment_factor = volatility_size_factor(
+            float(snapshot.current_atr), float(snapshot.avg_atr), float(self.volatility_threshold_multiplier)
+        )
         
-        # 根據波動率調整倉位大小
+        # 根據波動率調整倉位大小（波動率正常時係數為 1）
+        adjusted_quantity = base_quantity * adjustment_factor
         if atr_ratio > self.volatility_threshold_multiplier:
-            # 波動率較高時減少倉位
-            adjustment_factor = self.volatility_threshold_multiplier / atr_ratio
-            adjusted_quantity = base_quantity * adjustment_factor
             logging.info(f"{symbol}: 波動率較高 (ATR比率: {atr_ratio:.2f})，倉位調整係數: {adjustment_factor:.2f}")
         elif atr_ratio < 0.5:
-            # 波動率較低時可以適當增加倉位
-            adjustment_factor = min(1.5, 1.0 / atr_ratio)
-            adjusted_quantity = base_quantity * adjustment_factor
             logging.info(f"{symbol}: 波動率較低 (ATR比率: {atr_ratio:.2f})，倉位調整係數: {adjustment_factor:.2f}")
         else:
-            # 波動率正常
-            adjusted_quantity = base_quantity
             logging.debug(f"{symbol}: 波動率正常 (ATR比率: {atr_ratio:.2f})，使用基礎倉位大小")
             
         return adjusted_quantity
 
-    def check_max_position_limit(self) -> bool:
+    def check_max_position_limit(self, active_positions_count: int | None = None) -> bool:
         """
         檢查是否達到最大同時持倉數量限制
         
+        參數：
+            active_positions_count (int | None): 已知的活躍持倉數量，未提供時查詢數據庫
+            
         回傳：
             bool: True表示可以開新倉，False表示已達到限制
         """
@@ -1620,7 +2475,8 @@ class MultiSymbolTrader:
             
         try:
             # 統計當前活躍持倉數量
-            active_positions_count = Position.objects.filter(active=True).count()
+            if active_positions_count is None:
+                active_positions_count = Position.objects.filter(active=True).count()
             
             if active_positions_count >= self.max_simultaneous_positions:
                 logging.warning(f"已達到最大同時持倉數量限制 ({self.max_simultaneous_positions})，當前活躍持倉: {active_positions_count}")
@@ -1635,14 +2491,52 @@ class MultiSymbolTrader:
 
     def cleanup(self):
         """
-        清理資源，關閉監控服務
+        清理資源，關閉監控服務（只執行一次，重複呼叫直接返回）
         """
+        if getattr(self, '_closed', False):
+            return
+        self._closed = True
+        atexit.unregister(self.cleanup)
+
+        # 寫回尚未持久化的 TraderStatus 計數器
+        try:
+            if hasattr(self, '_status_flush_stop'):
+                self.stop_status_flusher()
+        except Exception as e:
+            logging.error(f"寫回 TraderStatus 失敗: {e}")
+
+        # 寫回尚未持久化的 ATR 比率
+        if hasattr(self, '_volatility_status_dirty'):
+            self.flush_volatility_status(force=True)
+
+        # 寫入尚未落盤的交易紀錄並關閉檔案
+        try:
+            if hasattr(self, '_trade_log_stop'):
+                self.stop_trade_log_writer()
+        except Exception as e:
+            logging.error(f"寫入交易紀錄失敗: {e}")
+
+        # 關閉 TradeLogger 長期開啟的 trades.csv
+        if hasattr(self, 'trade_logger'):
+            self.trade_logger.close()
+
+        # 關閉 K 線抓取執行緒池，尚未開始的抓取直接取消
+        if hasattr(self, '_kline_executor'):
+            self._kline_executor.shutdown(wait=False, cancel_futures=True)
+
         try:
             stop_system_monitoring()
             stop_monitoring_dashboard()
             logging.info("系統監控和監控告警已停止")
         except Exception as e:
             logging.error(f"停止系統監控失敗: {e}")
+
+        # 關閉交易所客戶端（停止行情 websocket）
+        try:
+            if hasattr(self, 'client') and self.client:
+                self.client.close()
+        except Exception as e:
+            logging.error(f"關閉交易所客戶端失敗: {e}")
             
         # 停止稽核層
         try:
@@ -1652,25 +2546,29 @@ class MultiSymbolTrader:
         except Exception as e:
             logging.error(f"停止稽核層失敗: {e}")
 
-    def __del__(self):
-        """
-        析構函數，確保資源被正確清理
-        """
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
         self.cleanup()
+        return False
 
     def check_and_sync_configs(self):
         """
         檢查並同步配置變化，特別是SYMBOLS配置
         """
+        # 每5分鐘檢查一次配置
+        now_mono = time.monotonic()
+        if now_mono - self._last_config_check_mono < self.config_sync_interval:
+            return
+
         try:
             current_time = timezone.now()
-            time_since_last_check = (current_time - self.last_config_check).total_seconds()
-            
-            # 每5分鐘檢查一次配置
-            if time_since_last_check < self.config_sync_interval:
-                return
             
             logging.info("🔍 開始檢查配置變化...")
+
+            # 以單次整表查詢刷新配置緩存，本輪同步的所有 get_config 均直接命中內存
+            self.reload_configs()
             
             # 檢查SYMBOLS配置是否有變化
             new_symbols = self.get_config('SYMBOLS', type=list, default=[])
@@ -1699,6 +2597,9 @@ class MultiSymbolTrader:
                 # 更新幣種列表
                 self.symbols = new_symbols
                 logging.info(f"✅ 幣種配置已同步更新: {self.symbols}")
+                # 新增的幣種追加訂閱價格 websocket
+                if added_symbols and hasattr(self.client, 'start_price_stream'):
+                    self.client.start_price_stream(added_symbols)
                 
                 # 更新相關配置
                 self._update_symbol_related_configs()
@@ -1716,7 +2617,19 @@ class MultiSymbolTrader:
                     logging.info("🔄 自動重新設置槓桿...")
                     self.set_leverage()
             
+            # 檢查啟用的策略組合是否變化，變化時重新解析自定義策略
+            active_combo = StrategyCombo.objects.filter(is_active=True).first()
+            if active_combo and (active_combo.combo_mode != self.active_combo_mode or
+                                 active_combo.conditions != self.custom_strategies_list):
+                logging.info(f"📝 檢測到策略組合變化: {self.active_combo_mode} -> {active_combo.combo_mode}")
+                self.active_combo_mode = active_combo.combo_mode
+                self._set_custom_strategies(active_combo.conditions)
+
+            # 同步交易對快照，納入後台新增或修改的 TradingPair
+            self._refresh_trading_pairs_snapshot()
+
             self.last_config_check = current_time
+            self._last_config_check_mono = now_mono
             logging.info("✅ 配置檢查完成")
             
         except Exception as e:
@@ -1728,12 +2641,7 @@ class MultiSymbolTrader:
         """
         try:
             # 初始化波動率暫停狀態
-            self.volatility_pause_status[symbol] = {
-                'is_paused': False,
-                'pause_start_time': None,
-                'pause_reason': None,
-                'current_atr_ratio': 1.0
-            }
+            self.volatility_pause_status[symbol] = dict(_VOLATILITY_PAUSE_DEFAULTS)
             
             # 初始化每日風控統計
             self.daily_stats[symbol] = {
@@ -1744,12 +2652,7 @@ class MultiSymbolTrader:
             }
             
             # 初始化持倉狀態
-            self.positions[symbol] = {
-                'active': False,
-                'side': None,
-                'entry_price': None,
-                'quantity': 0.0,
-            }
+            self.positions[symbol] = dict(_POSITION_DEFAULTS)
             
             # 初始化其他狀態
             self.cooldown_flags[symbol] = False
@@ -1765,24 +2668,14 @@ class MultiSymbolTrader:
         清理移除幣種的相關數據結構
         """
         try:
-            # 清理波動率暫停狀態
-            if symbol in self.volatility_pause_status:
-                del self.volatility_pause_status[symbol]
-            
-            # 清理每日風控統計
-            if symbol in self.daily_stats:
-                del self.daily_stats[symbol]
-            
-            # 清理持倉狀態
-            if symbol in self.positions:
-                del self.positions[symbol]
-            
-            # 清理其他狀態
-            if symbol in self.cooldown_flags:
-                del self.cooldown_flags[symbol]
-            
-            if symbol in self.last_trade_time:
-                del self.last_trade_time[symbol]
+            # 清理波動率暫停狀態、每日風控統計、持倉狀態及其他狀態
+            for state in (self.volatility_pause_status, self._volatility_status_objs, self.daily_stats,
+                          self.positions, self.cooldown_flags, self.last_trade_time, self._signal_cache):
+                state.pop(symbol, None)
+            for frames in (self._kline_frames, self._indicator_states):
+                for key in [key for key in frames if key[0] == symbol]:
+                    del frames[key]
+            self._volatility_status_dirty.discard(symbol)
             
             logging.info(f"✅ 已清理 {symbol} 的相關數據結構")
             
@@ -1803,13 +2696,18 @@ class MultiSymbolTrader:
             
             # 如果配置有變化，更新到數據庫
             if updated_intervals != intervals_config:
-                from trading_api.models import TraderConfig
-                try:
-                    config_obj = TraderConfig.objects.get(key='SYMBOL_INTERVALS')
-                    config_obj.value = json.dumps(updated_intervals, ensure_ascii=False)
-                    config_obj.save()
+                # 單次 UPDATE 只寫入 value 欄位，不必先讀取整列
+                updated = TraderConfig.objects.filter(key='SYMBOL_INTERVALS').update(
+                    value=json.dumps(updated_intervals, separators=(',', ':'), ensure_ascii=False),
+                    updated_at=timezone.now()
+                )
+                if updated:
+                    # 內存配置同步更新，避免在緩存過期前以舊值重複比對與寫入；
+                    # 週期讀取的是 cfg 快照，需一併重建才會使用新的幣種週期
+                    self.configs['SYMBOL_INTERVALS'] = updated_intervals
+                    self._cache_hot_configs()
                     logging.info(f"✅ 已更新SYMBOL_INTERVALS配置: {updated_intervals}")
-                except TraderConfig.DoesNotExist:
+                else:
                     logging.warning("⚠️ SYMBOL_INTERVALS配置不存在，跳過更新")
             
         except Exception as e:
@@ -2,13 +2,15 @@
 
 from trading.constants import SYMBOL_PRECISION
 
+# 精度查表在下單路徑上頻繁呼叫，預先綁定 dict.get
+_precision_get = SYMBOL_PRECISION.get
+
 
 def round_to_precision(symbol: str, value: float) -> float:
     """
     根據幣種精度將數值四捨五入，避免下單精度錯誤
     """
-    precision = SYMBOL_PRECISION.get(symbol, 3)
-    return round(value, precision)
+    return round(value, _precision_get(symbol, 3))
 
 
 def format_float(val: float, digits: int = 2) -> str:
@@ -18,5 +20,4 @@ def format_float(val: float, digits: int = 2) -> str:
     return f"{val:.{digits}f}"
 
 def get_precision(symbol: str) -> int:
-    from trading.constants import SYMBOL_PRECISION
-    return SYMBOL_PRECISION.get(symbol, 3)
+    return _precision_get(symbol, 3)
@@ -79,9 +79,8 @@ class Command(BaseCommand):
 
             while not trader_status.stop_signal_received:
                 trader.run_trading_cycle()
-                # 從數據庫獲取全局的 interval_seconds
-                global_interval_seconds = trader.get_config('GLOBAL_INTERVAL_SECONDS', type=int, default=3)
-                time.sleep(global_interval_seconds)
+                # 全局 interval_seconds 已綁定為實例屬性，重新載入配置時同步更新
+                time.sleep(trader.global_interval_seconds)
                 # 每次循環重新載入狀態，以響應外部的停止信號
                 trader_status.refresh_from_db()
 
@@ -0,0 +1,18 @@
+# Generated manually for incremental average ATR state
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trading_api', '0005_add_api_key_models'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tradingpair',
+            name='atr_state',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
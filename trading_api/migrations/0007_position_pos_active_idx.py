@@ -0,0 +1,17 @@
+# Generated manually for the active position partial index
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trading_api', '0006_tradingpair_atr_state'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='position',
+            index=models.Index(condition=models.Q(('active', True)), fields=['trading_pair'], name='pos_active_idx'),
+        ),
+    ]
@@ -26,6 +26,8 @@ class TradingPair(models.Model):
     symbol = models.CharField(max_length=20, unique=True)
     interval = models.CharField(max_length=10, default='1m')
     average_atr = models.FloatField(null=True, blank=True)
+    # 歷史平均 ATR 的遞推狀態，重啟時只需以新 K 線更新
+    atr_state = models.JSONField(null=True, blank=True)
     last_trade_time = models.DateTimeField(null=True, blank=True)
     consecutive_stop_loss = models.IntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -90,6 +92,10 @@ class Position(models.Model):
     class Meta:
         verbose_name = '持倉'
         verbose_name_plural = '持倉'
+        # 交易週期只查詢活躍持倉，部分索引只收錄 active=True 的列，不隨已平倉的歷史增長
+        indexes = [
+            models.Index(fields=['trading_pair'], condition=models.Q(active=True), name='pos_active_idx'),
+        ]
     
     def __str__(self):
         return f"{self.trading_pair.symbol} - {self.side} - {self.quantity}"
@@ -49,7 +49,7 @@ def verify_api_key(request, key_id):
         # 這裡可以添加實際的API驗證邏輯
         # 暫時模擬驗證成功
         api_key.is_verified = True
-        api_key.save()
+        api_key.save(update_fields=['is_verified', 'updated_at'])
         
         return Response({
             'success': True,